@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the localization scripts on a synthetic res/ tree.
+
+The generated tree has one base values/strings.xml with --keys entries
+(plain text, placeholders, apostrophes, entities and a plurals entry every
+50 keys) and --locales values-*/strings.xml files that each translate a
+random ~90% of the keys, some of them in the Adlam script.
+
+    python benchmark_translations.py --locales 86 --keys 540 --output bench.json
+    python benchmark_translations.py --locales 86 --keys 1080 --compare bench.json
+
+Results are written as JSON; --compare prints the ratio to a previous run
+and exits non-zero if a stage got slower than --threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import convert_to_adlam
+import fix_all_strings
+from merge_translations import merge_strings
+from resource_xml import ResourceFile
+from strings_catalog import StringsCatalog
+
+WORDS = ['contact', 'group', 'delete', 'share', 'phone', 'email', 'favorite', 'merge', 'backup',
+         'import', 'export', 'select', 'photo', 'address', 'birthday', 'ringtone', 'settings']
+ADLAM_WORDS = ['𞤳𞤮𞤲𞤼𞤢𞤳𞤼', '𞤸𞤢𞤤𞤢𞤤', '𞤲𞤢𞤲𞤺𞤢', '𞤧𞤢𞤲𞤣𞤵', '𞤬𞤮𞤼𞤮']
+LOCALE_CODES = ['fr', 'de', 'es', 'it', 'pt', 'ru', 'pl', 'ar', 'ja', 'ko', 'zh', 'hi', 'tr', 'nl', 'sv',
+                'b+ff+Adlm', 'b+ff+Latn', 'uk', 'cs', 'el']
+
+
+def _text(rng, words):
+    text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 8))).capitalize()
+    variant = rng.random()
+    if variant < 0.15:
+        text += ' %s'
+    elif variant < 0.2:
+        text = f'%1$d {text} %2$s'
+    elif variant < 0.3:
+        text += " it\\'s"
+    elif variant < 0.35:
+        text += ' &amp; &#39;more&#39;'
+    return text
+
+
+def generate_corpus(res_path, locales, keys, seed=0):
+    """Writes a synthetic res/ tree with one base file and `locales` translated files."""
+    rng = random.Random(seed)
+    names = [f'key_{index:05d}' for index in range(keys)]
+
+    def write(directory, entries):
+        lines = ['<?xml version="1.0" encoding="utf-8"?>', '<resources>']
+        for index, (name, text) in enumerate(entries):
+            if index % 100 == 0:
+                lines.append(f'    <!-- Section {index // 100} -->')
+            if index % 50 == 49:
+                lines.append(f'    <plurals name="{name}">')
+                lines.append(f'        <item quantity="one">%d {text}</item>')
+                lines.append(f'        <item quantity="other">%d {text}s</item>')
+                lines.append('    </plurals>')
+            else:
+                lines.append(f'    <string name="{name}">{text}</string>')
+        lines.append('</resources>')
+        os.makedirs(os.path.join(res_path, directory), exist_ok=True)
+        with open(os.path.join(res_path, directory, 'strings.xml'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    write('values', [(name, _text(rng, WORDS)) for name in names])
+    for index in range(locales):
+        code = LOCALE_CODES[index % len(LOCALE_CODES)]
+        qualifier = code if index < len(LOCALE_CODES) else f'{code}-r{index:02d}'
+        words = ADLAM_WORDS if 'Adlm' in code else WORDS
+        write(f'values-{qualifier}', [(name, _text(rng, words)) for name in names if rng.random() < 0.9])
+
+
+def _stage_parse(res_path, catalog):
+    for locale in catalog.locales():
+        ResourceFile.load(catalog.paths[locale]).entries()
+
+
+def _stage_diff(res_path, catalog):
+    fresh = StringsCatalog(res_path)
+    for locale in fresh.locales():
+        fresh.missing(locale)
+
+
+def _stage_merge(res_path, catalog):
+    out_path = os.path.join(res_path, '..', 'merged.xml')
+    for locale in catalog.locales():
+        merge_strings(catalog.paths[locale], catalog.missing(locale), out_path)
+
+
+def _stage_escape_fix(res_path, catalog):
+    for locale in catalog.locales():
+        fix_all_strings.fix_strings_file(catalog.paths[locale])
+
+
+def _stage_transliterate(res_path, catalog):
+    for locale in catalog.locales():
+        for text in catalog.strings(locale).values():
+            convert_to_adlam.convert_to_adlam(text)
+
+
+def _stage_write(res_path, catalog):
+    out_path = os.path.join(res_path, '..', 'written.xml')
+    for locale in catalog.locales():
+        resources = ResourceFile.load(catalog.paths[locale])
+        for entry in resources.entries():
+            if entry.kind == 'string':
+                resources.set_value(entry.values[0], entry.raw + ' ')
+        resources.save(out_path)
+
+
+STAGES = [
+    ('parse', _stage_parse),
+    ('diff', _stage_diff),
+    ('merge', _stage_merge),
+    ('escape-fix', _stage_escape_fix),
+    ('transliterate', _stage_transliterate),
+    ('write', _stage_write),
+]
+
+
+def run_benchmarks(locales, keys, repeat=5, seed=0, stages=None):
+    """Generates a corpus and times every stage; returns the JSON-serializable results."""
+    selected = [(name, stage) for name, stage in STAGES if not stages or name in stages]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        pristine = os.path.join(tmp, 'pristine')
+        generate_corpus(pristine, locales, keys, seed)
+        for name, stage in selected:
+            timings = []
+            for _ in range(repeat):
+                # Stages that rewrite files always start from the same generated tree
+                res_path = os.path.join(tmp, 'work', 'res')
+                shutil.rmtree(os.path.dirname(res_path), ignore_errors=True)
+                shutil.copytree(pristine, res_path)
+                catalog = StringsCatalog(res_path)
+                start = time.perf_counter()
+                stage(res_path, catalog)
+                timings.append(time.perf_counter() - start)
+            results[name] = {'min': min(timings), 'median': statistics.median(timings), 'runs': timings}
+
+    return {
+        'config': {'locales': locales, 'keys': keys, 'repeat': repeat, 'seed': seed},
+        'python': platform.python_version(),
+        'stages': results,
+    }
+
+
+def compare(current, previous, threshold):
+    """Prints per-stage ratios against a previous run; returns the stages slower than threshold."""
+    regressions = []
+    for name, timing in current['stages'].items():
+        before = previous['stages'].get(name)
+        if not before:
+            continue
+        ratio = timing['min'] / before['min'] if before['min'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions.append(name)
+            flag = '  <-- regression'
+        print(f"{name:14} {before['min'] * 1000:9.2f} ms -> {timing['min'] * 1000:9.2f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the localization toolchain on a synthetic res/ tree")
+    parser.add_argument('--locales', type=int, default=86)
+    parser.add_argument('--keys', type=int, default=540)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stage', action='append', choices=[name for name, _ in STAGES],
+                        help='only run this stage (repeatable)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='previous results JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio counted as a regression')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.locales, args.keys, args.repeat, args.seed, args.stage)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        for name, timing in results['stages'].items():
+            print(f"{name:14} min {timing['min'] * 1000:9.2f} ms  median {timing['median'] * 1000:9.2f} ms")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if compare(results, previous, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
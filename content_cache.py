@@ -0,0 +1,67 @@
+"""
+Persistent JSON cache of per-file results keyed by content hashes.
+
+A cached value is only returned while the hashes it was computed from are
+unchanged, so callers re-process just the files that were edited.
+"""
+
+import hashlib
+import json
+
+from write_batch import write_file
+
+
+def file_hash(path):
+    """Returns the SHA-256 hex digest of a file's bytes, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def text_hash(text):
+    """Returns a short, stable digest of a text (the first 16 hex digits of its SHA-256)."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+class ContentHashCache:
+    """Maps a key to a value plus the content hashes the value was derived from."""
+
+    def __init__(self, path, version=1):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        self.dirty = False
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                self.entries = data.get('entries', {})
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def get(self, key, *hashes):
+        """Returns the cached value for key if it was stored with the same hashes, else None."""
+        entry = self.entries.get(key)
+        if entry is None or entry['hashes'] != list(hashes):
+            return None
+        return entry['value']
+
+    def put(self, key, value, *hashes):
+        self.entries[key] = {'hashes': list(hashes), 'value': value}
+        self.dirty = True
+
+    def prune(self, keep):
+        """Drops the entries whose key is not in keep."""
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        write_file(self.path, json.dumps({'version': self.version, 'entries': self.entries},
+                                         ensure_ascii=False, sort_keys=True))
+        self.dirty = False
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Finds user-visible string literals in the Kotlin presentation layer and moves
+them into values/strings.xml.
+
+A small Kotlin tokenizer (comments, raw strings, string templates, nested
+calls) reports the literals passed to Text(...), showSnackbar(...) and to the
+contentDescription/label/placeholder arguments of any call. Literals whose
+text already has a key in values/strings.xml reuse that key; the others get a
+stable snake_case name derived from their text. Literals joined with `+` are
+reported for manual rewriting, since only the whole expression can become one
+resource.
+
+    python extract_hardcoded_strings.py            # report only
+    python extract_hardcoded_strings.py --write    # add the keys and rewrite the call sites
+
+Results are cached per Kotlin file by content hash, so repeated runs only
+re-tokenize the files that were edited.
+"""
+
+import argparse
+import os
+import re
+from pathlib import Path
+
+from content_cache import ContentHashCache, file_hash
+from resource_xml import ResourceFile
+from strings_catalog import BASE_STRINGS_FILE
+from write_batch import WriteBatch
+
+PRESENTATION_PATH = 'app/src/main/java/com/contacts/android/contacts/presentation'
+CACHE_FILE = '.extract_strings_cache.json'
+
+# Calls whose first positional argument is shown to the user
+VISIBLE_CALLS = {'Text', 'showSnackbar'}
+# Named arguments shown to the user, with the calls they count for (None: any call)
+VISIBLE_ARGS = {
+    'contentDescription': None,
+    'label': None,
+    'placeholder': None,
+    'text': {'Text'},
+    'message': {'showSnackbar'},
+    'actionLabel': {'showSnackbar'},
+}
+# Calls whose `label` is a debugging name rather than UI text
+NON_UI_CALL_PREFIXES = ('animate', 'updateTransition', 'rememberInfiniteTransition', 'Crossfade',
+                        'AnimatedContent', 'Deprecated')
+# Calls made outside composition (snackbars are shown from coroutines), where the
+# literal cannot simply become a stringResource() call
+NON_COMPOSABLE_CALLS = {'showSnackbar'}
+
+TOKEN_RE = re.compile(
+    r'(?P<ws>\s+)'
+    r'|(?P<comment>//[^\n]*)'
+    r'|(?P<ident>[A-Za-z_][A-Za-z0-9_]*|`[^`\n]+`)'
+    r'|(?P<number>\d[\w.]*)'
+    r"|(?P<char>'(?:[^'\\\n]|\\.)*')"
+    r'|(?P<punct>.)',
+    re.S,
+)
+
+
+def _skip_block_comment(text, pos):
+    """Returns the end of a (possibly nested) /* */ comment starting at pos."""
+    depth = 0
+    while pos < len(text):
+        if text.startswith('/*', pos):
+            depth += 1
+            pos += 2
+        elif text.startswith('*/', pos):
+            depth -= 1
+            pos += 2
+            if not depth:
+                return pos
+        else:
+            next_open = text.find('/*', pos)
+            next_close = text.find('*/', pos)
+            if next_close < 0:
+                return len(text)
+            pos = next_open if 0 <= next_open < next_close else next_close
+    return pos
+
+
+def _skip_template(text, pos):
+    """Returns the end of a ${...} template expression whose body starts at pos."""
+    depth = 1
+    while pos < len(text):
+        char = text[pos]
+        if char == '"':
+            pos, _ = _scan_string(text, pos)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if not depth:
+                return pos + 1
+        pos += 1
+    return pos
+
+
+def _scan_string(text, pos):
+    """Scans a "..." or \"\"\"...\"\"\" literal starting at pos; returns (end, has_template)."""
+    has_template = False
+    if text.startswith('"""', pos):
+        end = text.find('"""', pos + 3)
+        end = len(text) if end < 0 else end + 3
+        while end < len(text) and text[end] == '"':
+            end += 1
+        return end, '$' in text[pos:end]
+
+    pos += 1
+    while pos < len(text):
+        char = text[pos]
+        if char == '\\':
+            pos += 2
+            continue
+        if char == '"' or char == '\n':
+            return pos + 1, has_template
+        if char == '$' and pos + 1 < len(text):
+            following = text[pos + 1]
+            if following == '{':
+                has_template = True
+                pos = _skip_template(text, pos + 2)
+                continue
+            if following.isalpha() or following == '_':
+                has_template = True
+        pos += 1
+    return pos, has_template
+
+
+def iter_tokens(text):
+    """Yields (kind, start, end, has_template) for the significant tokens of a Kotlin source."""
+    pos = 0
+    while pos < len(text):
+        if text[pos] == '"':
+            end, has_template = _scan_string(text, pos)
+            yield 'string', pos, end, has_template
+            pos = end
+            continue
+        if text.startswith('/*', pos):
+            pos = _skip_block_comment(text, pos)
+            continue
+        match = TOKEN_RE.match(text, pos)
+        kind = match.lastgroup
+        if kind not in ('ws', 'comment'):
+            yield kind, pos, match.end(), False
+        pos = match.end()
+
+
+def strip_comments(text):
+    """Returns a Kotlin source with its comments blanked out; offsets and line numbers are unchanged."""
+    out = []
+    pos = 0
+    for _, start, end, _ in iter_tokens(text):
+        out.append(re.sub(r'[^\n]', ' ', text[pos:start]))
+        out.append(text[start:end])
+        pos = end
+    out.append(re.sub(r'[^\n]', ' ', text[pos:]))
+    return ''.join(out)
+
+
+def find_candidates(text):
+    """Returns the user-visible string literals of a Kotlin source as JSON-friendly dicts."""
+    candidates = []
+    calls = []
+    previous = []
+    last_candidate = None
+    for kind, start, end, has_template in iter_tokens(text):
+        value = text[start:end]
+        if last_candidate is not None and kind == 'punct' and value == '+':
+            last_candidate['concatenated'] = True
+        last_candidate = None
+        if kind == 'punct' and value == '(':
+            calls.append(previous[-1][1] if previous and previous[-1][0] == 'ident' else None)
+        elif kind == 'punct' and value == ')':
+            if calls:
+                calls.pop()
+        elif kind == 'string' and calls and not value.startswith('"""'):
+            call = calls[-1] or ''
+            site = None
+            if previous and previous[-1][1] == '(' and call in VISIBLE_CALLS:
+                site = call
+            elif (len(previous) >= 3 and previous[-1][1] == '=' and previous[-2][0] == 'ident'
+                  and previous[-3][1] in ('(', ',')):
+                argument = previous[-2][1]
+                allowed = VISIBLE_ARGS.get(argument, ())
+                if (allowed is None and not call.startswith(NON_UI_CALL_PREFIXES)) or (allowed and call in allowed):
+                    site = f'{call}({argument} = ...)'
+            if site:
+                last_candidate = {
+                    'start': start,
+                    'end': end,
+                    'literal': value[1:-1],
+                    'call': call,
+                    'site': site,
+                    'line': text.count('\n', 0, start) + 1,
+                    'template': has_template,
+                    'concatenated': False,
+                }
+                candidates.append(last_candidate)
+        previous.append((kind, value))
+        if len(previous) > 3:
+            del previous[0]
+    return candidates
+
+
+def kotlin_to_resource(literal):
+    """Converts the body of a Kotlin string literal to a raw strings.xml value."""
+    out = []
+    pos = 0
+    while pos < len(literal):
+        char = literal[pos]
+        if char == '\\' and pos + 1 < len(literal):
+            escaped = literal[pos + 1]
+            out.append('$' if escaped == '$' else literal[pos:pos + 2])
+            pos += 2
+            continue
+        out.append({"'": "\\'", '&': '&amp;', '<': '&lt;', '>': '&gt;'}.get(char, char))
+        pos += 1
+    raw = ''.join(out)
+    if raw[:1] in ('@', '?'):
+        raw = '\\' + raw
+    # aapt2 trims and collapses unquoted whitespace
+    if re.search(r'^\s|\s$|\s\s', raw):
+        raw = f'"{raw}"'
+    return raw
+
+
+def resource_name(raw, taken, max_words=5):
+    """Derives a stable snake_case resource name that is not in taken."""
+    words = re.findall(r'[a-z0-9]+', re.sub(r'&\w+;|\\.', ' ', raw).lower())
+    base = '_'.join(words[:max_words]) or 'text'
+    if base[0].isdigit():
+        base = 'text_' + base
+    name = base
+    suffix = 2
+    while name in taken:
+        name = f'{base}_{suffix}'
+        suffix += 1
+    return name
+
+
+def scan(paths, cache):
+    """Returns {path: candidates} using the per-file cache for unchanged files."""
+    results = {}
+    for path in paths:
+        key = str(path)
+        digest = file_hash(path)
+        candidates = cache.get(key, digest)
+        if candidates is None:
+            # Offsets index the text exactly as rewrite_file() reads it, \r\n included
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                candidates = find_candidates(f.read())
+            cache.put(key, candidates, digest)
+        results[key] = candidates
+    cache.prune(results)
+    return results
+
+
+def plan(results, base_strings):
+    """Assigns a resource name to every extractable literal; returns (new entries, rewrites, skipped)."""
+    by_value = {}
+    for name, raw in base_strings.items():
+        by_value.setdefault(raw, name)
+    taken = set(base_strings)
+    new_entries = {}
+    rewrites = {}
+    skipped = []
+    for path, candidates in results.items():
+        for candidate in candidates:
+            raw = kotlin_to_resource(candidate['literal'])
+            if candidate['template'] or candidate['concatenated'] or not re.search(r'[^\W\d_]', raw):
+                reason = ('string template' if candidate['template'] else
+                          'joined with +, needs manual rewrite' if candidate['concatenated'] else 'no text')
+                skipped.append((path, candidate, reason))
+                continue
+            name = by_value.get(raw)
+            if name is None:
+                name = resource_name(raw, taken)
+                taken.add(name)
+                by_value[raw] = name
+                new_entries[name] = raw
+            if candidate['call'] not in NON_COMPOSABLE_CALLS:
+                rewrites.setdefault(path, []).append((candidate, name))
+            else:
+                skipped.append((path, candidate, f'needs manual rewrite to R.string.{name}'))
+    return new_entries, rewrites, skipped
+
+
+IMPORTS = ('import androidx.compose.ui.res.stringResource', 'import com.contacts.android.contacts.R')
+
+
+def rewrite_file(path, rewrites, batch):
+    """Queues one file in batch with its literals replaced by stringResource() calls and the imports it needs."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = original = f.read()
+    for candidate, name in sorted(rewrites, key=lambda item: item[0]['start'], reverse=True):
+        text = text[:candidate['start']] + f'stringResource(R.string.{name})' + text[candidate['end']:]
+
+    missing_imports = [line for line in IMPORTS if not re.search(rf'^{re.escape(line)}\r?$', text, re.M)]
+    if missing_imports:
+        newline = '\r\n' if '\r\n' in text else '\n'
+        imports = ''.join(line + newline for line in missing_imports)
+        last_import = list(re.finditer(r'^import [^\n]*\n', text, re.M))
+        package = re.search(r'^package [^\n]*\n', text, re.M)
+        if last_import:
+            insert_at = last_import[-1].end()
+        elif package:
+            # A file without imports gets them below its package line, after a blank line
+            insert_at = package.end()
+            imports = newline + imports
+        else:
+            insert_at = 0
+        text = text[:insert_at] + imports + text[insert_at:]
+
+    batch.write(path, text, original)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract hard-coded UI strings from the Kotlin presentation layer")
+    parser.add_argument('--write', action='store_true', help='add the new keys and rewrite the call sites')
+    parser.add_argument('--no-cache', action='store_true', help='re-tokenize every file')
+    args = parser.parse_args()
+
+    if args.no_cache and os.path.exists(CACHE_FILE):
+        os.remove(CACHE_FILE)
+    cache = ContentHashCache(CACHE_FILE, version=2)
+    results = scan(sorted(Path(PRESENTATION_PATH).rglob('*.kt')), cache)
+    cache.save()
+
+    base = ResourceFile.load(BASE_STRINGS_FILE)
+    new_entries, rewrites, skipped = plan(results, base.strings())
+
+    for path in sorted(rewrites):
+        for candidate, name in rewrites[path]:
+            print(f"{path}:{candidate['line']}: \"{candidate['literal']}\" -> R.string.{name}")
+    for path, candidate, reason in skipped:
+        print(f"{path}:{candidate['line']}: \"{candidate['literal']}\" skipped ({reason})")
+    print(f"{len(new_entries)} new keys, {sum(len(r) for r in rewrites.values())} call sites to rewrite")
+
+    if args.write:
+        # The new keys and every rewritten call site are written together, or not at all
+        with WriteBatch() as batch:
+            for name, raw in new_entries.items():
+                base.append_string(name, raw)
+            base.save(batch=batch)
+            for path, file_rewrites in rewrites.items():
+                rewrite_file(path, file_rewrites, batch)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,28 @@
-import xml.etree.ElementTree as ET
 import json
 
+from plural_rules import missing_quantities
+from resource_xml import ResourceFile, read_resources
+from strings_catalog import get_locale_from_path
+
 def find_missing_translations(default_strings_path, br_strings_path):
     # Parse the default strings.xml
-    default_tree = ET.parse(default_strings_path)
-    default_root = default_tree.getroot()
-    default_strings = {string.get('name'): string.text for string in default_root.findall('string')}
+    default_resources = ResourceFile.load(default_strings_path).resources()
 
     # Parse the Breton strings.xml
-    try:
-        br_tree = ET.parse(br_strings_path)
-        br_root = br_tree.getroot()
-        br_strings = {string.get('name') for string in br_root.findall('string')}
-    except FileNotFoundError:
-        br_strings = set()
+    br_resources = read_resources(br_strings_path)
+    locale = get_locale_from_path(br_strings_path)
 
-    # Find missing strings
-    missing_strings = {}
-    for name, text in default_strings.items():
-        if name not in br_strings:
-            missing_strings[name] = text
+    # Find missing strings, plurals and string-arrays, and plurals lacking a CLDR quantity
+    missing = {'string': {}, 'plurals': {}, 'string-array': {}, 'quantities': {}}
+    for (kind, name), value in default_resources.items():
+        if (kind, name) not in br_resources:
+            missing[kind][name] = value
+        elif kind == 'plurals':
+            quantities = missing_quantities(locale, br_resources[(kind, name)])
+            if quantities:
+                missing['quantities'][name] = quantities
 
-    return missing_strings
+    return missing
 
 if __name__ == '__main__':
     missing = find_missing_translations(
@@ -30,4 +31,4 @@ if __name__ == '__main__':
     )
     with open('missing_translations.json', 'w') as f:
         json.dump(missing, f, indent=4)
-    print("Missing translations saved to missing_translations.json")
\ No newline at end of file
+    print("Missing translations saved to missing_translations.json")
@@ -1,56 +1,34 @@
-import os
-import re
-import xml.etree.ElementTree as ET
+import argparse
+import sys
 
-def fix_strings_file(file_path):
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        modified = False
-
-        for string in root.findall('string'):
-            if string.text:
-                original_text = string.text
-                print(f"Original text: {original_text}")
-
-                # Escape apostrophes, but only if they are not already escaped
-                new_text = re.sub(r"(?<!\\)'", r"\\\'", original_text)
-
-                # Fix non-positional format strings
-                placeholders = re.findall(r'%[sd]', new_text)
-                if len(placeholders) > 1:
-                    count = 1
-                    def replace_placeholder(match):
-                        nonlocal count
-                        replacement = f'%{count}${match.group(0)[-1]}'
-                        count += 1
-                        return replacement
-                    new_text = re.sub(r'%[sd]', replace_placeholder, new_text)
-
-                print(f"New text: {new_text}")
+from git_changes import add_changes_arguments, changes_from_args
+from locale_batch import add_jobs_argument, locale_string_files, report_errors
+from normalize_escapes import normalize_file, normalize_files
 
-                if new_text != original_text:
-                    string.text = new_text
-                    modified = True
-        
-        if modified:
-            tree.write(file_path, encoding='utf-8', xml_declaration=True)
-            print(f"Fixed {file_path}")
-
-    except ET.ParseError as e:
-        print(f"Error parsing {file_path}: {e}")
-    except Exception as e:
-        print(f"Error processing {file_path}: {e}")
-
-
-def fix_all_strings(res_path):
-    for dir_name in os.listdir(res_path):
-        if dir_name.startswith('values'):
-            dir_path = os.path.join(res_path, dir_name)
-            strings_path = os.path.join(dir_path, 'strings.xml')
-            if os.path.isfile(strings_path):
-                fix_strings_file(strings_path)
+def fix_strings_file(file_path):
+    """Normalizes escapes and placeholders in one strings.xml; returns True if it was rewritten."""
+    return bool(normalize_file(None, file_path))
+
+
+def fix_all_strings(res_path, jobs=1, changes=None):
+    locale_paths = locale_string_files(res_path, include_base=True)
+    if changes is not None:
+        locale_paths = changes.changed_files(locale_paths)
+    # Every changed file is written in one batch, or none if any fails
+    results = normalize_files(locale_paths, jobs)
+    if all(result.ok for result in results):
+        for result in results:
+            if result.value:
+                print(f"Fixed {result.path}")
+    return results
 
 if __name__ == '__main__':
-    fix_all_strings('app/src/main/res')
-    print("Finished fixing all strings.xml files.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Escape apostrophes and fix format strings in every strings.xml")
+    add_jobs_argument(parser)
+    add_changes_arguments(parser)
+    args = parser.parse_args()
+
+    results = fix_all_strings('app/src/main/res', args.jobs, changes_from_args(args))
+    if report_errors(results):
+        sys.exit(1)
+    print("Finished fixing all strings.xml files.")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Fuzzy translation memory over the app's own translations.
+
+Every base text (string, plural quantity, array item) is indexed by its
+character trigrams. A query returns the base texts most similar to it (Dice
+coefficient over trigram sets, 1.0 for identical text) together with what a
+locale already translated them to, so a new string can reuse an existing
+translation of the same or a near-identical string instead of going to MT.
+
+    python fuzzy_memory.py query "Delete selected contacts" --locale fr
+    python fuzzy_memory.py fill                      # auto-fill exact matches in every locale
+    python fuzzy_memory.py fill fr --threshold 0.9 --dry-run
+
+Placeholders, entities and escapes count as one opaque symbol when comparing,
+and a match is only reused when its format arguments are the same as the
+query's. The index is built from the catalog in a few milliseconds and
+queried in well under a millisecond.
+"""
+
+import argparse
+import sys
+import time
+
+from lint_resources import MARKER_RE
+from placeholder_mask import PROTECTED_RE, format_specifiers
+from strings_catalog import StringsCatalog
+from translation_lock import base_source, text_id
+
+DEFAULT_THRESHOLD = 1.0
+
+
+def normalize(text):
+    """Lowercases a raw value, collapses whitespace and turns every protected span into one symbol."""
+    return ' '.join(PROTECTED_RE.sub('\x00', text).lower().split())
+
+
+def trigrams(text):
+    padded = f'  {normalize(text)} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def base_texts(base_resources):
+    """Yields (text_id, source) for every text of the base entries."""
+    for (kind, name), value in base_resources.items():
+        if kind == 'plurals':
+            for quantity, source in value.items():
+                yield text_id(name, quantity), source
+        elif kind == 'string-array':
+            for index, source in enumerate(value):
+                yield text_id(name, index), source
+        else:
+            yield text_id(name), value
+
+
+class FuzzyIndex:
+    """Trigram posting lists over a fixed set of texts, searched by Dice similarity."""
+
+    __slots__ = ('ids', 'sources', 'sizes', 'postings')
+
+    def __init__(self, texts):
+        self.ids = list(texts)
+        self.sources = [texts[text] for text in self.ids]
+        self.sizes = []
+        self.postings = {}
+        for position, source in enumerate(self.sources):
+            grams = trigrams(source)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(position)
+
+    def search(self, text, min_score=0.5, accept=None):
+        """Returns [(score, text_id, source)] for the indexed texts at least min_score similar, best first."""
+        grams = trigrams(text)
+        counts = {}
+        for gram in grams:
+            for position in self.postings.get(gram, ()):
+                counts[position] = counts.get(position, 0) + 1
+        results = []
+        for position, shared in counts.items():
+            score = 2 * shared / (len(grams) + self.sizes[position])
+            if score >= min_score and (accept is None or accept(self.ids[position])):
+                if score == 1.0 and self.sources[position] != text:
+                    score = 0.99
+                results.append((score, self.ids[position], self.sources[position]))
+        results.sort(key=lambda result: -result[0])
+        return results
+
+
+class FuzzyMemory:
+    """A FuzzyIndex over the base texts plus each locale's existing translations of them."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.index = FuzzyIndex(dict(base_texts(catalog.base_resources)))
+        self._translations = {}
+
+    def translations(self, locale):
+        """Returns {text_id: raw} of the locale's real translations (not English copies or markers)."""
+        if locale not in self._translations:
+            translated = {}
+            for (kind, name), value in self.catalog.resolved_resources(locale).items():
+                if kind == 'plurals':
+                    texts = [(text_id(name, quantity), quantity, raw) for quantity, raw in value.items()]
+                elif kind == 'string-array':
+                    texts = [(text_id(name, index), index, raw) for index, raw in enumerate(value)]
+                else:
+                    texts = [(text_id(name), None, value)]
+                for text, position, raw in texts:
+                    source = base_source(self.catalog.base_resources, kind, name, position)
+                    if source is not None and raw and raw != source and not MARKER_RE.search(raw):
+                        translated[text] = raw
+            self._translations[locale] = translated
+        return self._translations[locale]
+
+    def suggest(self, locale, source, limit=5, min_score=0.5, exclude=None):
+        """Returns up to limit {'key', 'source', 'target', 'score'} of translated texts similar to source."""
+        translated = self.translations(locale)
+        results = self.index.search(source, min_score, lambda text: text in translated and text != exclude)
+        return [{'key': text, 'source': match, 'target': translated[text], 'score': round(score, 3)}
+                for score, text, match in results[:limit]]
+
+    def best(self, locale, source, threshold=DEFAULT_THRESHOLD, exclude=None):
+        """Returns the translation of the best match scoring at least threshold with the same format arguments."""
+        specifiers = sorted(format_specifiers(source))
+        for suggestion in self.suggest(locale, source, limit=5, min_score=threshold, exclude=exclude):
+            if sorted(format_specifiers(suggestion['source'])) == specifiers:
+                return suggestion['target']
+        return None
+
+
+def fill(memory, rows, threshold=DEFAULT_THRESHOLD):
+    """Yields the rows (see translation_exchange) whose target can be reused from the memory, filled in."""
+    for row in rows:
+        if row['target'] or not row['source']:
+            continue
+        position = row.get('quantity', row.get('index'))
+        target = memory.best(row['locale'], row['source'], threshold, exclude=text_id(row['key'], position))
+        if target is not None:
+            row['target'] = target
+            yield row
+
+
+def main():
+    from translation_exchange import export_rows, import_rows
+    from translation_lock import TranslationLock
+
+    parser = argparse.ArgumentParser(description="Reuse existing translations of identical or similar strings")
+    commands = parser.add_subparsers(dest='command', required=True)
+    query_parser = commands.add_parser('query', help='show the closest base texts and their translations')
+    query_parser.add_argument('text')
+    query_parser.add_argument('--locale', help='show translations in this locale')
+    query_parser.add_argument('--limit', type=int, default=5)
+    query_parser.add_argument('--min-score', type=float, default=0.5)
+    fill_parser = commands.add_parser('fill', help='auto-fill missing texts from matching translations')
+    fill_parser.add_argument('locales', nargs='*', help='locales to fill (default: all)')
+    fill_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                             help='minimum similarity to reuse a translation (1.0: identical text only)')
+    fill_parser.add_argument('--dry-run', action='store_true', help='list the reuses without writing')
+    args = parser.parse_args()
+
+    catalog = StringsCatalog()
+    start = time.perf_counter()
+    memory = FuzzyMemory(catalog)
+    built = time.perf_counter() - start
+
+    if args.command == 'query':
+        if args.locale:
+            memory.translations(args.locale)
+        start = time.perf_counter()
+        if args.locale:
+            results = memory.suggest(args.locale, args.text, args.limit, args.min_score)
+        else:
+            results = [{'key': text, 'source': source, 'score': round(score, 3)}
+                       for score, text, source in memory.index.search(args.text, args.min_score)[:args.limit]]
+        elapsed = time.perf_counter() - start
+        for result in results:
+            line = f"{result['score']:.3f}  {result['key']}: {result['source']}"
+            if 'target' in result:
+                line += f"  ->  {result['target']}"
+            print(line)
+        print(f"{len(results)} matches in {elapsed * 1000:.3f} ms (index of {len(memory.index.ids)} texts built in "
+              f"{built * 1000:.1f} ms)", file=sys.stderr)
+        return
+
+    filled = list(fill(memory, export_rows(catalog, args.locales), args.threshold))
+    for row in filled:
+        print(f"{row['locale']}: {row['key']} <- {row['target']}")
+    if not args.dry_run and filled:
+        lock = TranslationLock()
+        stats = import_rows(filled, catalog, lock)
+        lock.save()
+        print(f"Reused {stats['applied']} translations")
+    else:
+        print(f"{len(filled)} translations can be reused")
+
+
+if __name__ == '__main__':
+    main()
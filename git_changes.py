@@ -0,0 +1,105 @@
+"""
+Limits the res/values-* batch scripts to the string files changed in git.
+
+--since REF selects the strings.xml files that differ between REF and the
+working tree (new, untracked ones included); --staged the ones staged for the
+next commit. A renamed or deleted file counts as changed under its old path
+too, since the variants that fell back to it now resolve differently. The changed paths are read from git once. A locale whose own
+file, or the file of a parent locale it falls back to, changed is processed
+in full. When the base values/strings.xml changed, every other locale is only
+processed for the base keys whose English value was added or edited.
+
+    python verify_translations.py --since origin/main
+    python fix_all_strings.py --staged            # e.g. from a pre-commit hook
+"""
+
+import os
+import subprocess
+
+from resource_xml import ResourceFile, ResourceFormatError, read_resources
+from strings_catalog import RES_PATH, get_locale_from_path, parent_locale
+
+
+def add_changes_arguments(parser):
+    """Adds the shared --since / --staged options to an argparse parser."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--since', metavar='REF', help='only process string files changed since this git revision')
+    group.add_argument('--staged', action='store_true', help='only process string files staged for commit')
+
+
+def changes_from_args(args, res_path=RES_PATH):
+    """Returns the ChangeSet selected by --since / --staged, or None to process everything."""
+    if args.staged or args.since:
+        return ChangeSet(args.since, args.staged, res_path)
+    return None
+
+
+def _git(*args):
+    return subprocess.run(['git', *args], check=True, capture_output=True, encoding='utf-8').stdout
+
+
+class ChangeSet:
+    """The strings.xml files changed since a revision (or staged), and the base keys they change."""
+
+    def __init__(self, since=None, staged=False, res_path=RES_PATH):
+        self.since = since
+        self.staged = staged
+        self.base_path = os.path.normpath(os.path.join(res_path, 'values', 'strings.xml'))
+        if staged:
+            names = _git('diff', '--cached', '--name-only', '--no-renames', '--relative', '--', res_path)
+        else:
+            names = (_git('diff', '--name-only', '--no-renames', '--relative', since, '--', res_path)
+                     + _git('ls-files', '--others', '--exclude-standard', '--', res_path))
+        self.paths = {os.path.normpath(name) for name in names.splitlines() if os.path.basename(name) == 'strings.xml'}
+        self.locales = {get_locale_from_path(path) for path in self.paths} - {None}
+        self.base_changed = self.base_path in self.paths
+        self._base_keys = None
+
+    def _revision_resources(self, revision):
+        """Returns {(kind, name): value} of the base file at a revision ('' for the index), {} if it is absent."""
+        try:
+            text = _git('show', f'{revision}:./{self.base_path}')
+        except subprocess.CalledProcessError:
+            return {}
+        try:
+            return ResourceFile(text, self.base_path).resources()
+        except ResourceFormatError:
+            return {}
+
+    def base_keys(self):
+        """Returns the (kind, name) keys of the base entries added or edited (empty if the base is unchanged)."""
+        if self._base_keys is None:
+            self._base_keys = set()
+            if self.base_changed:
+                if self.staged:
+                    old, new = self._revision_resources('HEAD'), self._revision_resources('')
+                else:
+                    old, new = self._revision_resources(self.since), read_resources(self.base_path)
+                self._base_keys = {key for key, value in new.items() if old.get(key) != value}
+        return self._base_keys
+
+    def touches(self, locale):
+        """True if the locale's file, or that of a locale it falls back to, changed."""
+        while locale:
+            if locale in self.locales:
+                return True
+            locale = parent_locale(locale)
+        return False
+
+    def changed_files(self, locale_paths):
+        """Returns the (locale, path) pairs whose file itself changed, for per-file fixes."""
+        return [(locale, path) for locale, path in locale_paths if os.path.normpath(path) in self.paths]
+
+    def affected(self, locale_paths):
+        """
+        Splits (locale, path) pairs into (full, partial): the locales to process in
+        full, and those to process only for base_keys() because just the base changed.
+        """
+        full = []
+        partial = []
+        for locale, path in locale_paths:
+            if self.touches(locale):
+                full.append((locale, path))
+            elif self.base_keys():
+                partial.append((locale, path))
+        return full, partial
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Rule-based linter for every strings.xml in the project.
+
+Each rule is a precompiled check run over every string, plurals and
+string-array value in a single pass per file; files are spread over a
+process pool. Findings carry the exact file and line.
+
+    python lint_resources.py
+    python lint_resources.py --format json --output lint.json
+    python lint_resources.py --format sarif --output lint.sarif
+    python lint_resources.py --rule unescaped-apostrophe values-fr
+
+Exits with status 1 if any error-level finding was reported.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from locale_batch import add_jobs_argument, filter_dirs, locale_string_files, report_errors, run_locales
+from placeholder_mask import format_specifiers
+from resource_xml import ResourceFile
+from write_batch import write_file
+
+XML_ENTITIES = {'amp', 'lt', 'gt', 'quot', 'apos'}
+
+APOSTROPHE_RE = re.compile(r"(?<!\\)((?:\\\\)*)'")
+# Inline tags such as <xliff:g id='n'>; aapt2 does not unescape their attributes
+MARKUP_RE = re.compile(r'</?[a-zA-Z][^<>]*>')
+ESCAPE_RE = re.compile(r'\\(u[0-9a-fA-F]{4}|.|$)', re.S)
+VALID_ESCAPES = set('\'"\\@?ntu')
+MARKER_RE = re.compile(r'NEEDS TRANSLATION:|TRANSLATED to [A-Za-z0-9+-]+:')
+AMPERSAND_RE = re.compile(r'&(?:(#\d+|#x[0-9a-fA-F]+)|([A-Za-z][A-Za-z0-9]*))?(;)?')
+CHAR_REF_RE = re.compile(r'&(?:#(\d+)|#x([0-9a-fA-F]+)|(amp|lt|gt|quot|apos));')
+NAMED_CHARS = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+
+
+class Rule:
+    """
+    A lint rule: check(raw, attrs) yields (offset in the value, message) for each problem,
+    attrs being the attributes of the value's entry (e.g. formatted="false").
+    """
+
+    __slots__ = ('id', 'severity', 'description', 'check')
+
+    def __init__(self, rule_id, severity, description, check):
+        self.id = rule_id
+        self.severity = severity
+        self.description = description
+        self.check = check
+
+
+def decode_refs(raw):
+    """
+    Decodes character references the way the XML parser does before aapt2 sees
+    the text (so \\&#39; is an escaped apostrophe). Returns the decoded text and,
+    for each decoded character, its offset in raw.
+    """
+    if '&' not in raw:
+        return raw, None
+    chars = []
+    offsets = []
+    pos = 0
+    for match in CHAR_REF_RE.finditer(raw):
+        chars.append(raw[pos:match.start()])
+        offsets.extend(range(pos, match.start()))
+        decimal, hexadecimal, named = match.groups()
+        try:
+            char = chr(int(decimal)) if decimal else chr(int(hexadecimal, 16)) if hexadecimal else NAMED_CHARS[named]
+        except (ValueError, OverflowError):
+            char = '\ufffd'
+        chars.append(char)
+        offsets.append(match.start())
+        pos = match.end()
+    chars.append(raw[pos:])
+    offsets.extend(range(pos, len(raw)))
+    return ''.join(chars), offsets
+
+
+def mask_markup(raw):
+    """Blanks out the inline tags of a raw value, keeping every other offset in place."""
+    return MARKUP_RE.sub(lambda match: ' ' * len(match.group(0)), raw) if '<' in raw else raw
+
+
+def _decoded(check):
+    """Runs a check on the entity-decoded text outside markup and maps its offsets back to the raw value."""
+    def decoded_check(raw, attrs=None):
+        text, offsets = decode_refs(mask_markup(raw))
+        for offset, message in check(text, attrs):
+            yield (offsets[offset] if offsets and offset < len(offsets) else offset), message
+    return decoded_check
+
+
+def _is_quoted(raw):
+    stripped = raw.strip()
+    return len(stripped) >= 2 and stripped[0] == '"' and stripped[-1] == '"'
+
+
+def check_apostrophes(raw, attrs=None):
+    if "'" in raw and not _is_quoted(raw):
+        for match in APOSTROPHE_RE.finditer(raw):
+            yield match.end() - 1, "Unescaped apostrophe; use \\' or wrap the string in double quotes"
+
+
+def check_backslashes(raw, attrs=None):
+    if '\\' in raw:
+        for match in ESCAPE_RE.finditer(raw):
+            escaped = match.group(1)
+            if not escaped:
+                yield match.start(), "Trailing backslash"
+            elif escaped[0] not in VALID_ESCAPES or escaped == 'u':
+                yield match.start(), f"Invalid escape sequence \\{escaped}"
+
+
+def check_placeholders(raw, attrs=None):
+    # Like aapt2, strings marked formatted="false" are not format strings
+    if '%' in raw and (attrs or {}).get('formatted') != 'false':
+        specifiers = format_specifiers(raw)
+        if len(specifiers) > 1 and any('$' not in specifier for specifier in specifiers):
+            yield raw.index('%'), f"Multiple substitutions must be positional: {' '.join(specifiers)}"
+
+
+def check_markers(raw, attrs=None):
+    for match in MARKER_RE.finditer(raw):
+        yield match.start(), f"Leaked translation marker '{match.group(0)}'"
+
+
+def check_entities(raw, attrs=None):
+    if '&' in raw:
+        for match in AMPERSAND_RE.finditer(raw):
+            numeric, named, semicolon = match.groups()
+            if not semicolon or not (numeric or named):
+                yield match.start(), "Bare '&'; use &amp;"
+            elif named and named not in XML_ENTITIES:
+                yield match.start(), f"Undefined entity &{named};"
+
+
+RULES = [
+    Rule('unescaped-apostrophe', 'error', "Apostrophes must be escaped", _decoded(check_apostrophes)),
+    Rule('stray-backslash', 'error', "Backslashes must start a valid escape", _decoded(check_backslashes)),
+    Rule('non-positional-placeholders', 'error', "Strings with several placeholders must number them",
+         check_placeholders),
+    Rule('leaked-marker', 'error', "Translation pipeline markers must not ship", check_markers),
+    Rule('malformed-entity', 'error', "Entities must be well-formed XML entities", check_entities),
+]
+
+
+def lint_file(locale, path, rule_ids=None):
+    """Runs the rules over every value of one file; returns a list of finding dicts."""
+    rules = [rule for rule in RULES if not rule_ids or rule.id in rule_ids]
+    resources = ResourceFile.load(path)
+    findings = []
+    for entry in resources.entries():
+        for value in entry.values:
+            for rule in rules:
+                for offset, message in rule.check(value.raw, entry.attrs):
+                    findings.append({
+                        'rule': rule.id,
+                        'severity': rule.severity,
+                        'path': path,
+                        'line': resources.line_of(value.start + offset),
+                        'name': entry.name if value.quantity is None else f'{entry.name}[{value.quantity}]',
+                        'message': message,
+                    })
+    return findings
+
+
+def lint(locale_paths, jobs=1, rule_ids=None):
+    """Lints the given (locale, path) pairs; returns (findings, per-file results)."""
+    results = run_locales(lint_file, locale_paths, jobs, rule_ids)
+    findings = [finding for result in results if result.ok for finding in result.value]
+    return findings, results
+
+
+def to_sarif(findings):
+    rules_used = [rule for rule in RULES if any(finding['rule'] == rule.id for finding in findings)]
+    return {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{
+            'tool': {'driver': {
+                'name': 'lint_resources',
+                'rules': [{'id': rule.id, 'shortDescription': {'text': rule.description}} for rule in rules_used],
+            }},
+            'results': [{
+                'ruleId': finding['rule'],
+                'level': finding['severity'],
+                'message': {'text': f"{finding['name']}: {finding['message']}"},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': {'uri': finding['path']},
+                    'region': {'startLine': finding['line']},
+                }}],
+            } for finding in findings],
+        }],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lint every strings.xml for escaping and placeholder problems")
+    parser.add_argument('dirs', nargs='*', help='values-* directories to lint (default: all)')
+    parser.add_argument('--rule', action='append', choices=[rule.id for rule in RULES], help='only run this rule')
+    parser.add_argument('--format', choices=['text', 'json', 'sarif'], default='text')
+    parser.add_argument('--output', help='write the report to this file instead of stdout')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    locale_paths = filter_dirs(locale_string_files(include_base=True), args.dirs)
+
+    findings, results = lint(locale_paths, args.jobs, args.rule)
+
+    if args.format == 'json':
+        report = json.dumps(findings, ensure_ascii=False, indent=2)
+    elif args.format == 'sarif':
+        report = json.dumps(to_sarif(findings), ensure_ascii=False, indent=2)
+    else:
+        lines = [f"{f['path']}:{f['line']}: {f['severity']}: [{f['rule']}] {f['name']}: {f['message']}"
+                 for f in findings]
+        lines.append(f"{len(findings)} findings in {len(locale_paths)} files")
+        report = '\n'.join(lines)
+
+    if args.output:
+        write_file(args.output, report + '\n')
+    else:
+        print(report)
+
+    failed = report_errors(results)
+    if failed or any(finding['severity'] == 'error' for finding in findings):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Runs per-locale work for the res/values-* batch scripts over a process pool.
+
+Results come back in the order the locales were given, and an exception in
+one locale is recorded on its result instead of aborting the whole batch.
+"""
+
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from strings_catalog import RES_PATH, find_string_files, get_locale_from_path
+
+
+class LocaleResult:
+    """Outcome of running a task for one locale: either a value or an error message."""
+
+    __slots__ = ('locale', 'path', 'value', 'error')
+
+    def __init__(self, locale, path, value=None, error=None):
+        self.locale = locale
+        self.path = path
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def add_jobs_argument(parser):
+    """Adds the shared --jobs option to an argparse parser."""
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='number of worker processes (default: number of CPUs)')
+
+
+def locale_string_files(res_path=RES_PATH, include_base=False):
+    """Returns (locale, path) pairs for every values-*/strings.xml, sorted by locale."""
+    pairs = []
+    for string_file in find_string_files(res_path):
+        locale = get_locale_from_path(string_file)
+        if locale or include_base:
+            pairs.append((locale, string_file))
+    return sorted(pairs, key=lambda pair: pair[0] or '')
+
+
+def filter_dirs(locale_paths, dirs):
+    """Keeps the (locale, path) pairs whose values* directory is named in dirs; all of them if dirs is empty."""
+    if not dirs:
+        return locale_paths
+    wanted = {d.rstrip('/').split('/')[-1] for d in dirs}
+    return [(locale, path) for locale, path in locale_paths if (f'values-{locale}' if locale else 'values') in wanted]
+
+
+def _call(func, locale, path, args):
+    try:
+        return func(locale, path, *args), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def run_locales(func, locale_paths, jobs=1, *args):
+    """
+    Calls func(locale, path, *args) for every (locale, path) pair.
+
+    func must be a module-level function so it can be sent to worker processes.
+    With jobs <= 1 everything runs in the current process.
+    """
+    locale_paths = list(locale_paths)
+    if jobs <= 1 or len(locale_paths) <= 1:
+        outcomes = [_call(func, locale, path, args) for locale, path in locale_paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(locale_paths))) as executor:
+            futures = [executor.submit(_call, func, locale, path, args) for locale, path in locale_paths]
+            outcomes = [future.result() for future in futures]
+
+    return [LocaleResult(locale, path, value, error)
+            for (locale, path), (value, error) in zip(locale_paths, outcomes)]
+
+
+def report_errors(results):
+    """Prints the collected per-locale errors and returns how many there were."""
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        print(f"  [ERROR] {result.locale or 'base'} ({result.path}):")
+        print('    ' + result.error.rstrip().replace('\n', '\n    '))
+    return len(failed)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Reduces variant locales (pt-rPT, zh-rCN, b+es+419, ...) to minimal overlays.
+
+Android resolves a string missing from values-pt-rPT through values-pt, so a
+variant only has to carry the strings whose text differs from its parent.
+This tool reports, for every variant with a parent file in the tree, how many
+of its strings are identical to what the parent already resolves to, and with
+--write removes them. Before any file is written, the strings the variant
+resolves to are checked to be exactly the same as before; the variants are
+written together, and none of them if any check fails.
+
+    python locale_overlays.py                # report
+    python locale_overlays.py --write        # rewrite variants as overlays
+    python locale_overlays.py --write pt-rPT
+
+Locales that Android never resolves through their language file, such as the
+Traditional Chinese variants, are listed in strings_catalog.NO_PARENT_FALLBACK
+and are never reduced. The same goes for Pulaar (b+fuf+*), which has no
+Android parent to fall back to even though it is generated from Fulfulde.
+"""
+
+import argparse
+import sys
+
+from resource_xml import ResourceFile
+from strings_catalog import StringsCatalog, parent_locale
+from write_batch import WriteBatch
+
+
+def resolved_parent(catalog, locale):
+    """Returns the nearest parent locale present in the tree, or None."""
+    parent = parent_locale(locale)
+    while parent and parent not in catalog.paths:
+        parent = parent_locale(parent)
+    return parent
+
+
+def overlay(variant_strings, parent_strings):
+    """Returns the variant's strings that the parent does not already resolve to the same text."""
+    return {name: value for name, value in variant_strings.items() if parent_strings.get(name) != value}
+
+
+def plan(catalog, locales=None):
+    """Returns (locale, parent, redundant names) for every variant that has a parent file."""
+    plans = []
+    for locale in locales or catalog.locales():
+        parent = resolved_parent(catalog, locale)
+        if not parent:
+            continue
+        variant_strings = catalog.strings(locale)
+        kept = overlay(variant_strings, catalog.resolved(parent))
+        redundant = [name for name in variant_strings if name not in kept]
+        plans.append((locale, parent, redundant))
+    return plans
+
+
+def write_overlay(catalog, locale, parent, redundant, batch):
+    """
+    Queues one variant in batch without its redundant strings, after checking its resolved
+    strings are unchanged; returns True if the file changes.
+    """
+    resources = ResourceFile.load(catalog.paths[locale])
+    redundant = set(redundant)
+    for entry in resources.entries():
+        if entry.kind == 'string' and entry.name in redundant:
+            resources.remove(entry)
+
+    before = catalog.resolved(locale)
+    after = {**catalog.resolved(parent), **ResourceFile(resources.serialize()).strings()}
+    if after != before:
+        raise RuntimeError(f"{locale}: overlay would change resolved strings, not written")
+
+    return resources.save(batch=batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduce variant locales to the strings that differ from their parent")
+    parser.add_argument('locales', nargs='*', help='variant locales to process (default: all)')
+    parser.add_argument('--write', action='store_true', help='rewrite the variant files as minimal overlays')
+    args = parser.parse_args()
+
+    catalog = StringsCatalog()
+    total = 0
+    failed = False
+    batch = WriteBatch()
+    for locale, parent, redundant in plan(catalog, args.locales):
+        total += len(redundant)
+        print(f"{locale} -> {parent}: {len(redundant)} of {len(catalog.strings(locale))} strings identical to parent")
+        if args.write and redundant:
+            try:
+                write_overlay(catalog, locale, parent, redundant, batch)
+            except RuntimeError as e:
+                print(f"  [ERROR] {e}")
+                failed = True
+
+    print(f"{total} redundant strings in variant locales")
+    if failed:
+        if batch.pending:
+            print("Nothing written.")
+        sys.exit(1)
+    batch.commit()
+
+
+if __name__ == '__main__':
+    main()
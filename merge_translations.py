@@ -1,7 +1,113 @@
 
-import xml.etree.ElementTree as ET
 import sys
 
+from plural_rules import CATEGORY_ORDER
+from resource_xml import ResourceFile, read_resources
+from strings_catalog import BASE_STRINGS_FILE
+
+def base_order(base_file_path=BASE_STRINGS_FILE):
+    """Returns the (kind, name) keys of the base file in file order."""
+    return list(read_resources(base_file_path))
+
+def _in_order(entries, rank):
+    last = -1
+    for entry in entries:
+        position = rank.get((entry.kind, entry.name))
+        if position is not None:
+            if position < last:
+                return False
+            last = position
+    return True
+
+def merge_join(order, entries, rank=None):
+    """
+    Walks the base keys (in base order) and a locale's entries (in file order) together,
+    yielding ('both', key, entry), ('extra', key, entry) and ('missing', key, anchor),
+    where anchor is the locale entry the missing key belongs just above (None: the end).
+
+    Linear time; when the locale follows base order no per-file index is built. A
+    locale whose order has drifted is handled through a set of its keys instead.
+    """
+    rank = rank or {key: position for position, key in enumerate(order)}
+    present = None if _in_order(entries, rank) else {(entry.kind, entry.name) for entry in entries}
+    keys = iter(order)
+    next_key = next(keys, None)
+    for entry in entries:
+        key = (entry.kind, entry.name)
+        position = rank.get(key)
+        if position is None:
+            yield 'extra', key, entry
+            continue
+        while next_key is not None and rank[next_key] < position:
+            if present is None or next_key not in present:
+                yield 'missing', next_key, entry
+            next_key = next(keys, None)
+        if next_key == key:
+            next_key = next(keys, None)
+        yield 'both', key, entry
+    while next_key is not None:
+        if present is None or next_key not in present:
+            yield 'missing', next_key, None
+        next_key = next(keys, None)
+
+def diff(order, entries):
+    """Returns (missing keys, extra keys) of a locale's entries against the base order."""
+    missing = []
+    extra = []
+    for event, key, _ in merge_join(order, entries):
+        if event == 'missing':
+            missing.append(key)
+        elif event == 'extra':
+            extra.append(key)
+    return missing, extra
+
+def _category_rank(quantity):
+    return CATEGORY_ORDER.index(quantity) if quantity in CATEGORY_ORDER else len(CATEGORY_ORDER)
+
+def _add_quantities(resources, entry, quantities):
+    existing = entry.quantities()
+    for quantity, raw in quantities.items():
+        if quantity in existing:
+            continue
+        # Above the first item of a later category, so one/few/many/other stay in CLDR order
+        before = next((value for value in entry.values
+                       if _category_rank(value.quantity) > _category_rank(quantity)), None)
+        resources.add_quantity(entry, quantity, raw, before)
+
+def merge_resources(base_file_path, new_resources, output_file_path, order=None, batch=None):
+    """
+    Inserts the entries of new_resources ({(kind, name): value}, see Entry.value) that
+    base_file_path does not define yet at their place in base order, and adds the missing
+    quantities of plurals it does define in CLDR order. Existing entries and comments are
+    kept as they are, so merging twice changes nothing.
+
+    order is the base key sequence (default: values/strings.xml); keys outside it go last.
+    With a write_batch.WriteBatch the output is queued in it instead of written at once.
+    """
+    resources = ResourceFile.load(base_file_path, create=True)
+    order = list(base_order() if order is None else order)
+    rank = {key: position for position, key in enumerate(order)}
+    for key in new_resources:
+        if key not in rank:
+            rank[key] = len(order)
+            order.append(key)
+
+    for event, (kind, name), entry in merge_join(order, resources.entries(), rank):
+        value = new_resources.get((kind, name))
+        if value is None:
+            continue
+        if event == 'missing':
+            resources.insert_entry(kind, name, value, entry)
+        elif event == 'both' and kind == 'plurals':
+            _add_quantities(resources, entry, value)
+
+    return resources.save(output_file_path, batch)
+
+def merge_strings(base_file_path, new_strings, output_file_path):
+    """Inserts the strings of new_strings ({name: raw value}) whose names are not yet in base_file_path."""
+    merge_resources(base_file_path, {('string', name): value for name, value in new_strings.items()},
+                    output_file_path)
+
 def main():
     if len(sys.argv) != 4:
         print("Usage: python merge_translations.py <base_file> <new_strings_file> <output_file>")
@@ -11,23 +117,9 @@ def main():
     new_strings_file_path = sys.argv[2]
     output_file_path = sys.argv[3]
 
-    try:
-        base_tree = ET.parse(base_file_path)
-        base_root = base_tree.getroot()
-    except (ET.ParseError, FileNotFoundError):
-        base_root = ET.Element('resources')
-        base_tree = ET.ElementTree(base_root)
-
-    new_strings_tree = ET.parse(new_strings_file_path)
-    new_strings_root = new_strings_tree.getroot()
-
-    existing_string_names = {elem.attrib['name'] for elem in base_root.findall('string')}
-
-    for new_string in new_strings_root.findall('string'):
-        if new_string.attrib['name'] not in existing_string_names:
-            base_root.append(new_string)
+    new_resources = ResourceFile.load(new_strings_file_path).resources()
 
-    base_tree.write(output_file_path, encoding='utf-8', xml_declaration=True)
+    merge_resources(base_file_path, new_resources, output_file_path)
 
 if __name__ == '__main__':
     main()
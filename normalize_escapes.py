@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Rewrites every strings.xml value into one canonical escaped form.
+
+The canonical form, which aapt2 compiles to exactly the same text as any of
+the spellings it replaces:
+  - apostrophes are \\' (not ', &#39;, &apos; or \\&#39;)
+  - an escaped character reference such as \\&quot; becomes the plain escape \\"
+  - backslashes only start valid escapes (\\' \\" \\\\ \\@ \\? \\n \\t \\uXXXX);
+    any other backslash is dropped, as aapt2 itself would drop it
+  - a value with several format arguments numbers them (%1$s %2$d) unless
+    the entry is formatted="false"
+  - the XML declaration is <?xml version="1.0" encoding="utf-8"?>
+Inline markup such as <xliff:g id='x'> is left untouched.
+
+normalize_value() is idempotent, and a file is only written when its bytes
+change, so running this on a clean tree touches nothing and Gradle's
+incremental resource compilation stays incremental.
+
+    python normalize_escapes.py               # normalize every file
+    python normalize_escapes.py --dry-run     # print the diff instead
+    python normalize_escapes.py values-fr
+"""
+
+import argparse
+import difflib
+import re
+import sys
+
+from lint_resources import CHAR_REF_RE, MARKUP_RE, NAMED_CHARS
+from locale_batch import add_jobs_argument, filter_dirs, locale_string_files, report_errors, run_locales
+from placeholder_mask import PROTECTED_RE, format_specifiers
+from resource_xml import ResourceFile
+from write_batch import WriteBatch
+
+DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+DECLARATION_RE = re.compile(r'<\?xml\s+version\s*=\s*([\'"])1\.0\1\s+encoding\s*=\s*([\'"])utf-8\2\s*\?>', re.I)
+
+# Characters that keep their backslash; everything else escaped is the character itself
+KEPT_ESCAPES = set('\'"\\@?nt')
+
+VALUE_TOKEN_RE = re.compile(
+    rf'(?P<markup>{MARKUP_RE.pattern})'
+    r'|\\(?P<escaped_ref>&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);)'
+    r'|(?P<unicode>\\u[0-9a-fA-F]{4})'
+    r'|\\(?P<escaped>.|$)'
+    r'|(?P<apostrophe>\'|&#39;|&#x27;|&apos;)',
+    re.S,
+)
+
+
+def _ref_char(ref):
+    match = CHAR_REF_RE.fullmatch(ref)
+    if not match:
+        return None
+    decimal, hexadecimal, named = match.groups()
+    try:
+        return chr(int(decimal)) if decimal else chr(int(hexadecimal, 16)) if hexadecimal else NAMED_CHARS[named]
+    except (ValueError, OverflowError):
+        return None
+
+
+def _normalize_token(match):
+    kind = match.lastgroup
+    if kind == 'apostrophe':
+        return "\\'"
+    if kind == 'escaped_ref':
+        ref = match.group('escaped_ref')
+        char = _ref_char(ref)
+        return '\\' + char if char in KEPT_ESCAPES else ref
+    if kind == 'escaped':
+        char = match.group('escaped')
+        return '\\' + char if char in KEPT_ESCAPES or char == 'u' else char
+    return match.group(0)
+
+
+def number_placeholders(raw):
+    """Numbers the format arguments of a value that has several and none numbered yet."""
+    # Only real conversions count: a literal '50% off' or an escaped '%%' is prose
+    specifiers = format_specifiers(raw)
+    if len(specifiers) < 2 or any('$' in specifier for specifier in specifiers):
+        return raw
+    position = 0
+
+    def replace(match):
+        nonlocal position
+        span = match.group(0)
+        if not span.startswith('%') or span == '%%':
+            return span
+        position += 1
+        return f'%{position}${span[1:]}'
+
+    return PROTECTED_RE.sub(replace, raw)
+
+
+def normalize_value(raw, formatted=True):
+    """Returns the canonical form of a raw value."""
+    if '\\' in raw or "'" in raw or '&' in raw:
+        raw = VALUE_TOKEN_RE.sub(_normalize_token, raw)
+    if formatted and '%' in raw:
+        raw = number_placeholders(raw)
+    return raw
+
+
+def normalize_resources(resources):
+    """Queues the canonical form of the declaration and every value of a ResourceFile."""
+    declaration = DECLARATION_RE.match(resources.text)
+    if declaration and declaration.group(0) != DECLARATION:
+        resources.replace(0, declaration.end(), DECLARATION)
+    for entry in resources.entries():
+        formatted = entry.attrs.get('formatted') != 'false'
+        for value in entry.values:
+            resources.set_value(value, normalize_value(value.raw, formatted))
+    return resources
+
+
+def normalize_file(locale, path, write=True, batch=None):
+    """Normalizes one strings.xml; returns its unified diff ('' if already canonical). A batch only queues the write."""
+    resources = normalize_resources(ResourceFile.load(path))
+    content = resources.serialize()
+    if content == resources.text:
+        return ''
+    if write:
+        resources.save(batch=batch)
+    return ''.join(difflib.unified_diff(resources.text.splitlines(True), content.splitlines(True), path, path))
+
+
+def stage_file(locale, path):
+    """Normalizes one strings.xml into a new WriteBatch, for a worker process; returns (diff, batch)."""
+    batch = WriteBatch()
+    return normalize_file(locale, path, batch=batch), batch
+
+
+def normalize_files(locale_paths, jobs=1):
+    """
+    Normalizes the given (locale, path) pairs in worker processes and writes the changed
+    files in one batch; nothing is written if any file fails. Returns the per-file results,
+    whose values are the diffs.
+    """
+    results = run_locales(stage_file, locale_paths, jobs)
+    batch = WriteBatch()
+    for result in results:
+        if result.ok:
+            result.value, staged = result.value
+            batch.update(staged)
+    if all(result.ok for result in results):
+        batch.commit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite every strings.xml into the canonical escaped form")
+    parser.add_argument('dirs', nargs='*', help='values* directories to normalize (default: all)')
+    parser.add_argument('--dry-run', action='store_true', help='print the diff without writing anything')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    locale_paths = filter_dirs(locale_string_files(include_base=True), args.dirs)
+
+    if args.dry_run:
+        results = run_locales(normalize_file, locale_paths, args.jobs, False)
+    else:
+        results = normalize_files(locale_paths, args.jobs)
+    changed = [result for result in results if result.ok and result.value]
+    for result in changed:
+        if args.dry_run:
+            sys.stdout.write(result.value)
+        else:
+            print(f"Normalized {result.path}")
+    failed = report_errors(results)
+    print(f"{len(changed)} of {len(locale_paths)} files {'would change' if args.dry_run else 'rewritten'}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Masks format specifiers, XML entities, escapes and inline markup in a string
+resource before machine translation, and restores them afterwards.
+
+    masked, tokens = mask("Delete %1$d contacts from &quot;%2$s&quot;?")
+    # masked == "Delete ⟦0⟧ contacts from ⟦1⟧⟦2⟧⟦3⟧?"
+    unmask(translator(masked), tokens)
+"""
+
+import re
+
+PROTECTED_RE = re.compile(
+    r'%(?:\d+\$)?[-#+0,(]*\d*(?:\.\d+)?[sdfxXoeEgGcbh%]'    # %s, %d, %1$s, %.2f, %% (not '50% off')
+    r'|&(?:#\d+|#x[0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);'      # &#39; &amp; &quot;
+    r'|\\u[0-9a-fA-F]{4}'                                    # \u2026
+    r'|\\.'                                                  # \' \n \" \\ \@
+    r'|</?[a-zA-Z][^<>]*>'                                   # <b>, </b>, <xliff:g id="x">
+)
+TOKEN_RE = re.compile(r'⟦\s*(\d+)\s*⟧')
+
+
+class PlaceholderError(ValueError):
+    """Raised when a translation lost, duplicated or invented a masked token."""
+
+
+def mask(text):
+    """Replaces every protected span with an opaque ⟦n⟧ token; returns (masked_text, tokens)."""
+    tokens = []
+
+    def replace(match):
+        tokens.append(match.group(0))
+        return f'⟦{len(tokens) - 1}⟧'
+
+    return PROTECTED_RE.sub(replace, text), tokens
+
+
+def unmask(text, tokens):
+    """Restores the tokens of a masked (and translated) text, checking each appears exactly once."""
+    seen = []
+
+    def replace(match):
+        index = int(match.group(1))
+        if index >= len(tokens):
+            raise PlaceholderError(f"Unknown token ⟦{index}⟧ in {text!r}")
+        seen.append(index)
+        return tokens[index]
+
+    restored = TOKEN_RE.sub(replace, text)
+    if sorted(seen) != list(range(len(tokens))):
+        raise PlaceholderError(f"Tokens {tokens} not preserved exactly once in {text!r}")
+    return restored
+
+
+def format_specifiers(text):
+    """Returns the format specifiers of a text, e.g. ['%1$s', '%2$d']."""
+    return [span for span in PROTECTED_RE.findall(text) if span.startswith('%') and span != '%%']
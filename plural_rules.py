@@ -0,0 +1,70 @@
+"""
+CLDR plural categories of every language the app ships, for <plurals> coverage.
+
+The table is the set of cardinal categories CLDR 44 defines per language: a
+<plurals> resource must provide each of them for Android to pick the right
+text for every count. Locales are resolved once to their language and cached,
+so checking every locale is a dictionary lookup.
+
+    categories('ru')        # frozenset({'one', 'few', 'many', 'other'})
+    categories('b+es+419')  # frozenset({'one', 'many', 'other'})
+"""
+
+from functools import lru_cache
+
+CATEGORY_ORDER = ('zero', 'one', 'two', 'few', 'many', 'other')
+
+# Languages without CLDR plural rules (bqi, cr, fuf, kr, ltg, oc, zgh, ...) get the English categories
+DEFAULT_CATEGORIES = frozenset({'one', 'other'})
+
+_RULES = {
+    'other': 'in id ja ko ms my th vi zh',
+    'one other': 'bg bn ckb da de el en eo et eu fa ff fi fil gl hi hu ia is kn mk ml nb ne nl nn or pa '
+                 'si sv ta te tr ur',
+    'one many other': 'ca es fr it pt',
+    'one few other': 'bs hr ro sr',
+    'one two other': 'he iw sat',
+    'zero one other': 'lv',
+    'one few many other': 'cs lt pl ru sk uk',
+    'one two few other': 'sl',
+    'one two few many other': 'br ga',
+    'zero one two few many other': 'ar cy',
+}
+
+PLURAL_CATEGORIES = {language: frozenset(categories.split())
+                     for categories, languages in _RULES.items() for language in languages.split()}
+
+
+def language_of(locale):
+    """Returns the language subtag of a resource qualifier: pt-rBR -> pt, b+es+419 -> es."""
+    if locale.startswith('b+'):
+        return locale.split('+')[1].lower()
+    return locale.split('-')[0].lower()
+
+
+@lru_cache(maxsize=None)
+def categories(locale):
+    """Returns the plural categories a locale's <plurals> must define (None: the base file, English)."""
+    if locale is None:
+        return PLURAL_CATEGORIES['en']
+    return PLURAL_CATEGORIES.get(language_of(locale), DEFAULT_CATEGORIES)
+
+
+def ordered(quantities):
+    """Sorts quantities in CLDR order (zero, one, two, few, many, other)."""
+    return sorted(quantities, key=lambda quantity: CATEGORY_ORDER.index(quantity)
+                  if quantity in CATEGORY_ORDER else len(CATEGORY_ORDER))
+
+
+def missing_quantities(locale, quantities):
+    """Returns the categories of a locale missing from a plurals' {quantity: raw}, in CLDR order."""
+    return ordered(categories(locale) - set(quantities))
+
+
+def for_locale(locale, quantities):
+    """
+    Spreads a source plurals' {quantity: raw} over the categories a locale needs,
+    using the source's 'other' text for the categories the source lacks.
+    """
+    fallback = quantities.get('other', next(iter(quantities.values()), ''))
+    return {quantity: quantities.get(quantity, fallback) for quantity in ordered(categories(locale))}
@@ -3,10 +3,14 @@
 Replace hard-coded strings with string resources across all Kotlin files
 """
 
-import os
+import argparse
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from locale_batch import add_jobs_argument
+from write_batch import WriteBatch
+
 # Mapping of hard-coded strings to their resource names
 STRING_REPLACEMENTS = {
     # Photo Picker Dialog
@@ -180,63 +184,74 @@ STRING_REPLACEMENTS = {
 }
 
 
-def replace_in_file(file_path):
-    """Replace hard-coded strings in a single file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+# One pass per file: every Text("...") call is matched by this single regex and
+# its literal looked up in STRING_REPLACEMENTS, so the cost of a file does not
+# grow with the size of the mapping table.
+TEXT_LITERAL_RE = re.compile(r'Text\(("(?:[^"\\\n]|\\.)*")\)')
 
-        original_content = content
-        modified = False
 
-        # Check if file is a @Composable context (has stringResource available)
-        is_composable = '@Composable' in content or 'stringResource' in content
+def replace_in_file(file_path):
+    """
+    Replace hard-coded strings in a single file, for a worker process.
+    Returns the (literal, resource) pairs replaced and a WriteBatch holding the new file.
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        content = f.read()
 
-        for old_string, resource_id in STRING_REPLACEMENTS.items():
-            if old_string not in content:
-                continue
+    replaced = []
 
-            # Replace Text(...) with Text(stringResource(...))
-            pattern = rf'Text\({re.escape(old_string)}\)'
-            if re.search(pattern, content):
-                replacement = f'Text(stringResource({resource_id}))'
-                new_content = re.sub(pattern, replacement, content)
-                if new_content != content:
-                    content = new_content
-                    modified = True
-                    print(f"  Replaced {old_string} -> stringResource({resource_id})")
+    def replace(match):
+        resource_id = STRING_REPLACEMENTS.get(match.group(1))
+        if resource_id is None:
+            return match.group(0)
+        replaced.append((match.group(1), resource_id))
+        return f'Text(stringResource({resource_id}))'
 
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+    new_content = TEXT_LITERAL_RE.sub(replace, content)
 
-    except Exception as e:
-        print(f"  Error processing {file_path}: {e}")
-        return False
+    batch = WriteBatch()
+    batch.write(str(file_path), new_content, content)
+    return replaced, batch
 
 
 def main():
     """Main function to process all Kotlin files."""
+    parser = argparse.ArgumentParser(description="Replace hard-coded Text(\"...\") literals with string resources")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     presentation_path = Path('app/src/main/java/com/contacts/android/contacts/presentation')
 
     if not presentation_path.exists():
         print(f"Error: Presentation path not found: {presentation_path}")
         return
 
-    kt_files = list(presentation_path.rglob('*.kt'))
+    kt_files = sorted(presentation_path.rglob('*.kt'))
     print(f"Found {len(kt_files)} Kotlin files in presentation layer\n")
 
     modified_files = []
-
-    for kt_file in kt_files:
-        print(f"Processing: {kt_file.name}")
-        if replace_in_file(kt_file):
-            modified_files.append(kt_file)
-            print(f"  [MODIFIED]\n")
-        else:
-            print(f"  - No changes\n")
+    batch = WriteBatch()
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = [executor.submit(replace_in_file, kt_file) for kt_file in kt_files]
+        for kt_file, future in zip(kt_files, futures):
+            print(f"Processing: {kt_file.name}")
+            try:
+                replaced, staged = future.result()
+            except Exception as e:
+                print(f"  Error processing {kt_file}: {e}\n")
+                continue
+            batch.update(staged)
+            for old_string, resource_id in replaced:
+                print(f"  Replaced {old_string} -> stringResource({resource_id})")
+            if replaced:
+                modified_files.append(kt_file)
+                print(f"  [MODIFIED]\n")
+            else:
+                print(f"  - No changes\n")
+
+    # Every modified file is written at once, after all of them were processed
+    batch.commit()
 
     print("=" * 60)
     print(f"Replacement complete!")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Indexes where each string resource is used and prunes the unused ones.
+
+Every .kt file and every non-strings XML file under app/src is scanned for
+R.string.x / R.plurals.x / R.array.x and @string/x / @plurals/x / @array/x
+references outside comments, so a key only mentioned in a comment counts as
+unused. The per-file results are cached by content hash, so re-runs only
+rescan edited files.
+
+    python resource_usage.py                  # unused keys and references to missing keys
+    python resource_usage.py --where merge    # usage sites of one key
+    python resource_usage.py --prune          # delete unused keys from every locale
+
+--prune refuses to run while any source calls getIdentifier(), since keys
+looked up by name at runtime cannot be seen by the index.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from content_cache import ContentHashCache, file_hash
+from extract_hardcoded_strings import strip_comments
+from locale_batch import locale_string_files
+from resource_xml import ResourceFile
+from strings_catalog import BASE_STRINGS_FILE
+from write_batch import WriteBatch
+
+SOURCE_ROOT = 'app/src'
+CACHE_FILE = '.resource_usage_cache.json'
+
+KOTLIN_REF_RE = re.compile(r'\bR\.(string|plurals|array)\.(\w+)')
+XML_REF_RE = re.compile(r'@(string|plurals|array)/(\w+)')
+XML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+DYNAMIC_LOOKUP_RE = re.compile(r'\bgetIdentifier\s*\(')
+
+KINDS = {'string': 'string', 'plurals': 'plurals', 'array': 'string-array'}
+
+
+def source_files(root=SOURCE_ROOT):
+    """Returns the Kotlin and XML files that can reference string resources, excluding the string files."""
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        in_values = os.path.basename(dirpath).startswith('values')
+        for filename in filenames:
+            if filename.endswith('.kt') or (filename.endswith('.xml') and not (in_values and filename == 'strings.xml')):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def scan_file(path):
+    """Returns {'refs': [[kind, name, line], ...], 'dynamic': bool} for one source file."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    if path.endswith('.kt'):
+        text = strip_comments(text)
+        pattern = KOTLIN_REF_RE
+    else:
+        text = XML_COMMENT_RE.sub(lambda match: re.sub(r'[^\n]', ' ', match.group(0)), text)
+        pattern = XML_REF_RE
+    refs = [[KINDS[match.group(1)], match.group(2), text.count('\n', 0, match.start()) + 1]
+            for match in pattern.finditer(text)]
+    return {'refs': refs, 'dynamic': bool(DYNAMIC_LOOKUP_RE.search(text))}
+
+
+class UsageIndex:
+    """Maps (kind, name) to the [path, line] sites that reference it."""
+
+    def __init__(self, root=SOURCE_ROOT, cache_path=CACHE_FILE):
+        cache = ContentHashCache(cache_path, version=2)
+        self.usages = {}
+        self.dynamic_files = []
+        self.files = {}
+        for path in source_files(root):
+            digest = file_hash(path)
+            result = cache.get(path, digest)
+            if result is None:
+                result = scan_file(path)
+                cache.put(path, result, digest)
+            self.files[path] = result
+        cache.prune(self.files)
+        cache.save()
+        self._rebuild()
+
+    def _rebuild(self):
+        self.usages = {}
+        self.dynamic_files = []
+        for path, result in self.files.items():
+            for kind, name, line in result['refs']:
+                self.usages.setdefault((kind, name), []).append((path, line))
+            if result['dynamic']:
+                self.dynamic_files.append(path)
+
+    def update_file(self, path):
+        """Rescans one source file (or drops it if deleted) and refreshes the index."""
+        if os.path.exists(path):
+            self.files[path] = scan_file(path)
+        else:
+            self.files.pop(path, None)
+        self._rebuild()
+
+    def unused(self, entries):
+        """Returns the (kind, name) pairs of entries that nothing references."""
+        return [key for key in entries if key not in self.usages]
+
+    def missing(self, entries):
+        """Returns {(kind, name): sites} for references to keys that are not defined."""
+        defined = set(entries)
+        return {key: sites for key, sites in self.usages.items() if key not in defined}
+
+
+def base_entries(base_path=BASE_STRINGS_FILE):
+    return [(entry.kind, entry.name) for entry in ResourceFile.load(base_path).entries()]
+
+
+def prune(unused, res_path='app/src/main/res'):
+    """Removes the unused entries from the base and every locale file; writes nothing if any file fails."""
+    unused = set(unused)
+    batch = WriteBatch()
+    for _, path in locale_string_files(res_path, include_base=True):
+        resources = ResourceFile.load(path)
+        for entry in resources.entries():
+            if (entry.kind, entry.name) in unused:
+                resources.remove(entry)
+        resources.save(batch=batch)
+    return batch.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report unused and missing string resources")
+    parser.add_argument('--where', metavar='NAME', help='list the usage sites of a key')
+    parser.add_argument('--prune', action='store_true', help='delete unused keys from every strings.xml')
+    args = parser.parse_args()
+
+    index = UsageIndex()
+    entries = base_entries()
+
+    if args.where:
+        for kind, name in entries:
+            if name == args.where:
+                for path, line in index.usages.get((kind, name), []):
+                    print(f"{path}:{line}")
+        return
+
+    unused = index.unused(entries)
+    missing = index.missing(entries)
+    for kind, name in unused:
+        print(f"unused {kind}: {name}")
+    for (kind, name), sites in sorted(missing.items()):
+        for path, line in sites:
+            print(f"{path}:{line}: missing {kind}: {name}")
+    print(f"{len(entries)} keys, {len(unused)} unused, {len(missing)} referenced but not defined")
+
+    if args.prune and unused:
+        if index.dynamic_files:
+            print("Not pruning: resources are looked up by name in " + ', '.join(index.dynamic_files))
+            sys.exit(1)
+        written = prune(unused)
+        print(f"Pruned {len(unused)} keys from {len(written)} files")
+
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
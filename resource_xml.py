@@ -0,0 +1,373 @@
+"""
+Streaming, structure-preserving reader/writer for Android strings.xml files.
+
+iter_entries() pulls <string>, <plurals> and <string-array> entries out of the
+file text one at a time, recording the character span of every value instead
+of building a DOM. ResourceFile collects edits against those spans and writes
+the file back with everything else - the XML declaration, comments, blank
+lines and indentation - kept byte-for-byte.
+
+Values are the raw XML between the tags: entities such as &#39; and escapes
+such as \\' are left exactly as they appear in the file.
+"""
+
+import bisect
+import re
+
+from write_batch import write_file
+
+ENTRY_KINDS = ('string', 'plurals', 'string-array')
+
+TAG_RE = re.compile(r'<(/?)([\w:.-]+)((?:\s+[\w:.-]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*)\s*(/?)>')
+ATTR_RE = re.compile(r'([\w:.-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+
+NEW_FILE = '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n</resources>\n'
+
+
+class ResourceFormatError(ValueError):
+    """Raised when a strings.xml file cannot be tokenized."""
+
+
+class Value:
+    """One editable text span: a <string> body, or a single <item> of a plurals/string-array."""
+
+    __slots__ = ('start', 'end', 'raw', 'quantity')
+
+    def __init__(self, start, end, raw, quantity=None):
+        self.start = start
+        self.end = end
+        self.raw = raw
+        self.quantity = quantity
+
+
+class Entry:
+    """A top-level resource entry and the spans of its values."""
+
+    __slots__ = ('kind', 'name', 'attrs', 'start', 'end', 'values')
+
+    def __init__(self, kind, name, attrs, start, end, values):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.start = start
+        self.end = end
+        self.values = values
+
+    @property
+    def raw(self):
+        """The raw body of a <string> entry."""
+        return self.values[0].raw if self.values else ''
+
+    @property
+    def translatable(self):
+        return self.attrs.get('translatable') != 'false'
+
+    def quantities(self):
+        """Returns {quantity: raw} for a <plurals> entry."""
+        return {value.quantity: value.raw for value in self.values}
+
+    def value(self):
+        """Returns the raw body of a <string>, {quantity: raw} of a <plurals> or [raw, ...] of a <string-array>."""
+        if self.kind == 'plurals':
+            return self.quantities()
+        if self.kind == 'string-array':
+            return [value.raw for value in self.values]
+        return self.raw
+
+
+def _attrs(attr_text):
+    return {match.group(1): match.group(2) if match.group(2) is not None else match.group(3)
+            for match in ATTR_RE.finditer(attr_text)}
+
+
+def _skip_special(text, pos):
+    """Returns the end of a comment/declaration/CDATA starting at pos, or None if pos starts a tag."""
+    for opener, closer in (('<!--', '-->'), ('<?', '?>'), ('<![CDATA[', ']]>'), ('<!', '>')):
+        if text.startswith(opener, pos):
+            end = text.find(closer, pos + len(opener))
+            if end < 0:
+                raise ResourceFormatError(f"Unterminated {opener} at offset {pos}")
+            return end + len(closer)
+    return None
+
+
+def _close_of(text, tag, pos):
+    end = text.find(f'</{tag}>', pos)
+    if end < 0:
+        raise ResourceFormatError(f"Missing </{tag}> after offset {pos}")
+    return end
+
+
+def _read_items(text, kind, pos):
+    """Reads the <item> children of a plurals/string-array starting at pos; returns (values, end)."""
+    values = []
+    while True:
+        lt = text.find('<', pos)
+        if lt < 0:
+            raise ResourceFormatError(f"Missing </{kind}> after offset {pos}")
+        special_end = _skip_special(text, lt)
+        if special_end is not None:
+            pos = special_end
+            continue
+        match = TAG_RE.match(text, lt)
+        if not match:
+            raise ResourceFormatError(f"Malformed tag at offset {lt}")
+        closing, tag, attr_text, empty = match.groups()
+        if closing and tag == kind:
+            return values, match.end()
+        if tag == 'item' and not closing:
+            quantity = _attrs(attr_text).get('quantity')
+            if empty:
+                values.append(Value(match.end(), match.end(), '', quantity))
+                pos = match.end()
+            else:
+                close = _close_of(text, 'item', match.end())
+                values.append(Value(match.end(), close, text[match.end():close], quantity))
+                pos = close + len('</item>')
+        else:
+            pos = match.end()
+
+
+def iter_entries(text):
+    """Yields the Entry objects of a strings.xml text in file order."""
+    pos = 0
+    while True:
+        lt = text.find('<', pos)
+        if lt < 0:
+            return
+        special_end = _skip_special(text, lt)
+        if special_end is not None:
+            pos = special_end
+            continue
+        match = TAG_RE.match(text, lt)
+        if not match:
+            raise ResourceFormatError(f"Malformed tag at offset {lt}")
+        closing, tag, attr_text, empty = match.groups()
+        if closing or tag not in ENTRY_KINDS:
+            pos = match.end()
+            continue
+
+        attrs = _attrs(attr_text)
+        name = attrs.get('name')
+        if empty:
+            values = [Value(match.end(), match.end(), '')] if tag == 'string' else []
+            end = match.end()
+        elif tag == 'string':
+            close = _close_of(text, 'string', match.end())
+            values = [Value(match.end(), close, text[match.end():close])]
+            end = close + len('</string>')
+        else:
+            values, end = _read_items(text, tag, match.end())
+        yield Entry(tag, name, attrs, lt, end, values)
+        pos = end
+
+
+class ResourceFile:
+    """A strings.xml file plus pending span edits, serialized without touching unedited bytes."""
+
+    def __init__(self, text, path=None):
+        self.path = path
+        self.text = text
+        self._entries = None
+        self._line_starts = None
+        self._edits = {}
+        self._insert_count = 0
+
+    @classmethod
+    def load(cls, path, create=False):
+        """Reads a file; a missing file raises unless create is set, in which case it starts empty."""
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                return cls(f.read(), path)
+        except FileNotFoundError:
+            if not create:
+                raise
+            return cls(NEW_FILE, path)
+
+    def entries(self):
+        if self._entries is None:
+            self._entries = list(iter_entries(self.text))
+        return self._entries
+
+    def strings(self):
+        """Returns {name: raw} of the <string> entries, in file order."""
+        return {entry.name: entry.raw for entry in self.entries() if entry.kind == 'string'}
+
+    def resources(self):
+        """Returns {(kind, name): value} of every entry, in file order (see Entry.value)."""
+        return {(entry.kind, entry.name): entry.value() for entry in self.entries()}
+
+    def line_of(self, offset):
+        """Returns the 1-based line number of a character offset."""
+        if self._line_starts is None:
+            self._line_starts = [0] + [match.end() for match in re.finditer('\n', self.text)]
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def set_value(self, value, raw):
+        """Replaces the raw text of one Value; a no-op if it is unchanged."""
+        self.replace(value.start, value.end, raw)
+
+    def replace(self, start, end, text):
+        """Replaces a span of the original file; replacing it with its own text drops the edit."""
+        if text == self.text[start:end]:
+            self._edits.pop((start, end, -1), None)
+        else:
+            self._edits[(start, end, -1)] = text
+
+    def insert(self, offset, text):
+        """Inserts text at an offset of the original file; inserts at one offset keep their call order."""
+        self._insert_count += 1
+        self._edits[(offset, offset, self._insert_count)] = text
+
+    def remove(self, entry):
+        """Deletes an entry together with its indentation and trailing newline."""
+        start = self.text.rfind('\n', 0, entry.start) + 1
+        if self.text[start:entry.start].strip():
+            start = entry.start
+        end = entry.end
+        if self.text.startswith('\n', end):
+            end += 1
+        self._edits[(start, end, -1)] = ''
+
+    def indent(self):
+        """Returns the indentation used for top-level entries (four spaces if the file has none)."""
+        for entry in self.entries():
+            line_start = self.text.rfind('\n', 0, entry.start) + 1
+            prefix = self.text[line_start:entry.start]
+            if not prefix.strip():
+                return prefix
+        return '    '
+
+    def closing_offset(self):
+        """Returns the offset of the start of the line holding </resources>."""
+        close = self.text.rfind('</resources>')
+        if close < 0:
+            raise ResourceFormatError("Missing </resources>")
+        line_start = self.text.rfind('\n', 0, close) + 1
+        return line_start if not self.text[line_start:close].strip() else close
+
+    def _append(self, formatted):
+        offset = self.closing_offset()
+        # </resources> sharing a line with the last entry (</plurals></resources>): start a new line
+        first = not any(start == end == offset for start, end, _ in self._edits)
+        if first and offset and self.text[offset - 1] != '\n':
+            formatted = '\n' + formatted
+        self.insert(offset, formatted)
+
+    def append_string(self, name, raw):
+        """Adds a <string> entry at the end of <resources>."""
+        self._append(format_string(name, raw, self.indent()))
+
+    def append_entry(self, kind, name, value):
+        """Adds a <string>, <plurals> or <string-array> entry at the end of <resources>."""
+        self._append(format_entry(kind, name, value, self.indent()))
+
+    def insert_entry(self, kind, name, value, before=None):
+        """Adds an entry on its own line just above the entry before, or at the end of <resources>."""
+        if before is None:
+            self.append_entry(kind, name, value)
+            return
+        line_start = self.text.rfind('\n', 0, before.start) + 1
+        prefix = self.text[line_start:before.start]
+        if prefix.strip():
+            self.insert(before.start, format_entry(kind, name, value, '').rstrip('\n'))
+        else:
+            self.insert(line_start, format_entry(kind, name, value, prefix))
+
+    def add_quantity(self, entry, quantity, raw, before=None):
+        """Adds an <item quantity="..."> to a <plurals> entry, above the item before or at the end."""
+        if before is not None:
+            tag = self.text.rfind('<item', 0, before.start)
+            line_start = self.text.rfind('\n', 0, tag) + 1
+            prefix = self.text[line_start:tag]
+            if not prefix.strip():
+                self.insert(line_start, f'{prefix}<item quantity="{quantity}">{raw}</item>\n')
+            else:
+                self.insert(tag, f'<item quantity="{quantity}">{raw}</item>')
+            return
+        close = entry.end - len('</plurals>')
+        line_start = self.text.rfind('\n', 0, close) + 1
+        if self.text[line_start:close].strip():
+            self.insert(close, f'<item quantity="{quantity}">{raw}</item>')
+            return
+        item_indent = self.indent() * 2
+        if entry.values:
+            first_line = self.text.rfind('\n', 0, entry.values[0].start) + 1
+            prefix = self.text[first_line:self.text.find('<item', first_line)]
+            if not prefix.strip():
+                item_indent = prefix
+        self.insert(line_start, f'{item_indent}<item quantity="{quantity}">{raw}</item>\n')
+
+    @property
+    def changed(self):
+        return self.serialize() != self.text
+
+    def serialize(self):
+        if not self._edits:
+            return self.text
+        parts = []
+        pos = 0
+        for start, end, order in sorted(self._edits):
+            parts.append(self.text[pos:start])
+            parts.append(self._edits[(start, end, order)])
+            pos = end
+        parts.append(self.text[pos:])
+        return ''.join(parts)
+
+    def save(self, path=None, batch=None):
+        """
+        Writes the file atomically if its content changed; returns True if it was written.
+        With a write_batch.WriteBatch the write is only queued, to be committed with the batch's other files.
+        """
+        path = path or self.path
+        current = self.text if path == self.path else None
+        if batch is not None:
+            return batch.write(path, self.serialize(), current)
+        return write_file(path, self.serialize(), current)
+
+
+def format_string(name, raw, indent='    '):
+    """Returns the source line of a <string> entry."""
+    return f'{indent}<string name="{name}">{raw}</string>\n'
+
+
+def format_entry(kind, name, value, indent='    '):
+    """Returns the source lines of a <string> (raw), <plurals> ({quantity: raw}) or <string-array> ([raw])."""
+    if kind == 'string':
+        return format_string(name, value, indent)
+    if kind == 'plurals':
+        items = [f'{indent * 2}<item quantity="{quantity}">{raw}</item>\n' for quantity, raw in value.items()]
+    else:
+        items = [f'{indent * 2}<item>{raw}</item>\n' for raw in value]
+    return f'{indent}<{kind} name="{name}">\n' + ''.join(items) + f'{indent}</{kind}>\n'
+
+
+def map_value(value, func):
+    """Applies func to every text of a string (raw), plurals ({quantity: raw}) or string-array ([raw]) value."""
+    if isinstance(value, dict):
+        return {quantity: func(raw) for quantity, raw in value.items()}
+    if isinstance(value, list):
+        return [func(raw) for raw in value]
+    return func(value)
+
+
+def escape_text(text):
+    """Escapes plain text (e.g. machine-translation output) for use as a raw <string> body."""
+    return (text.replace('\\', '\\\\').replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            .replace("'", "\\'").replace('"', '\\"'))
+
+
+def read_resources(path):
+    """Returns {(kind, name): value} for every entry of a file, or {} if it is missing or malformed."""
+    try:
+        return ResourceFile.load(path).resources()
+    except (FileNotFoundError, ResourceFormatError):
+        return {}
+
+
+def read_strings(path):
+    """Returns {name: raw} for the <string> entries of a file, or {} if it is missing or malformed."""
+    try:
+        return ResourceFile.load(path).strings()
+    except (FileNotFoundError, ResourceFormatError):
+        return {}
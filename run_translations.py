@@ -1,64 +1,89 @@
 
-import os
-import subprocess
+import argparse
+import sys
 
-def get_locale_from_path(path):
-    parts = path.split(os.sep)
-    for part in parts:
-        if part.startswith('values-'):
-            locale = part.split('values-')[1]
-            return locale
-    return None
+from git_changes import add_changes_arguments, changes_from_args
+from locale_batch import add_jobs_argument, report_errors, run_locales
+from merge_translations import merge_resources
+from plural_rules import for_locale, missing_quantities
+from resource_xml import map_value
+from strings_catalog import StringsCatalog, parent_locales, parse_resources, resolve_resources
+from write_batch import WriteBatch
 
-def main():
-    base_strings_file = 'app/src/main/res/values/strings.xml'
-    
-    # glob for all strings.xml files
-    res_path = 'app/src/main/res'
-    string_files = []
-    for dirpath, _, filenames in os.walk(res_path):
-        for filename in filenames:
-            if filename == 'strings.xml':
-                string_files.append(os.path.join(dirpath, filename))
-
-    # Already translated
-    translated_locales = ['fr', 'es', 'de']
-
-    for string_file in string_files:
-        locale = get_locale_from_path(string_file)
-        if not locale or locale in translated_locales or 'b+es+419' in locale :
+def translate_locale(locale, string_file, base_resources, keys=None, filled=()):
+    """
+    Marks and merges the base entries and plural quantities missing from one locale.
+    keys limits the base entries looked at, e.g. to those a commit changed. An entry
+    missing from a variant whose parent locale is in filled (processed in the same run)
+    is left to the parent, so the variant inherits it rather than getting a copy.
+    Returns (how many were added, WriteBatch holding the merged file).
+    """
+    locale_resources = resolve_resources(string_file)
+    own_resources = parse_resources(string_file)
+    parent_filled = any(parent in filled for parent in parent_locales(locale))
+    missing_strings = {}
+    for (kind, name), value in base_resources.items():
+        if keys is not None and (kind, name) not in keys:
             continue
-        
-        print(f"Processing {locale}...")
+        if kind == 'plurals' and (kind, name) in own_resources:
+            # Only the quantities the locale's CLDR categories still lack are added
+            if not missing_quantities(locale, own_resources[(kind, name)]):
+                continue
+        elif (kind, name) in locale_resources or parent_filled:
+            continue
+        missing_strings[(kind, name)] = for_locale(locale, value) if kind == 'plurals' else value
+    batch = WriteBatch()
+    if not missing_strings:
+        return 0, batch
 
-        missing_filename = f"missing_{locale}.xml"
-        translated_filename = f"translated_{locale}.xml"
+    # This is where the translation would happen.
+    # For now, we'll just mark the missing strings with the target locale.
+    # This is because I cannot call myself to do the translation in a script.
+    # I will do it manually for each file after running this script.
+    translated_strings = {key: map_value(value, lambda raw: f"TRANSLATED to {locale.upper()}: {raw}")
+                          for key, value in missing_strings.items()}
 
-        # 1. Find missing strings
-        with open(missing_filename, 'w') as f:
-            subprocess.run(['python', 'update_translations.py', base_strings_file, string_file], stdout=f)
+    merge_resources(string_file, translated_strings, string_file, order=base_resources, batch=batch)
+    return len(translated_strings), batch
 
-        # 2. Read missing strings and "translate" them
-        with open(missing_filename, 'r') as f:
-            missing_strings_content = f.read()
+def main():
+    parser = argparse.ArgumentParser(description="Merge marked placeholders for missing strings into every locale")
+    add_jobs_argument(parser)
+    add_changes_arguments(parser)
+    args = parser.parse_args()
 
-        # This is where the translation would happen.
-        # For now, we'll just replace the "NEEDS TRANSLATION" placeholder with a marker.
-        # This is because I cannot call myself to do the translation in a script.
-        # I will do it manually for each file after running this script.
-        translated_strings_content = missing_strings_content.replace("NEEDS TRANSLATION:", f"TRANSLATED to {locale.upper()}:")
+    # The base strings are parsed once and shared with every worker
+    catalog = StringsCatalog()
 
-        with open(translated_filename, 'w') as f:
-            f.write(translated_strings_content)
+    # Already translated
+    translated_locales = ['fr', 'es', 'de']
 
-        # 3. Merge translations
-        subprocess.run(['python', 'merge_translations.py', string_file, translated_filename, string_file])
+    locale_paths = [(locale, catalog.paths[locale]) for locale in catalog.locales()
+                    if locale not in translated_locales and 'b+es+419' not in locale]
 
-        # 4. Clean up
-        os.remove(missing_filename)
-        os.remove(translated_filename)
-        
-        print(f"Finished {locale}.")
+    changes = changes_from_args(args, catalog.res_path)
+    if changes is None:
+        filled = frozenset(locale for locale, _ in locale_paths)
+        results = run_locales(translate_locale, locale_paths, args.jobs, catalog.base_resources, None, filled)
+    else:
+        # Locales untouched by the change only need the base entries it added or edited; a parent
+        # only filled for those entries cannot stand in for a variant processed in full
+        full, partial = changes.affected(locale_paths)
+        full_locales = frozenset(locale for locale, _ in full)
+        results = (run_locales(translate_locale, full, args.jobs, catalog.base_resources, None, full_locales)
+                   + run_locales(translate_locale, partial, args.jobs, catalog.base_resources, changes.base_keys(),
+                                 full_locales | {locale for locale, _ in partial}))
+    # The workers only stage their files; they are written together unless a locale failed
+    if report_errors(results):
+        print("Nothing written.")
+        sys.exit(1)
+    batch = WriteBatch()
+    for result in results:
+        added, staged = result.value
+        batch.update(staged)
+        if added:
+            print(f"Finished {result.locale}: {added} strings added.")
+    batch.commit()
 
 if __name__ == '__main__':
     main()
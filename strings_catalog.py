@@ -0,0 +1,296 @@
+"""
+In-process catalog of the app's strings.xml resources.
+
+The base values/strings.xml is parsed once and every values-*/strings.xml is
+parsed once into a name -> text index, so the translation scripts can query
+missing/extra keys without spawning one interpreter per locale. The
+*_resources variants cover <plurals> and <string-array> as well, keyed by
+(kind, name), and report the plural quantities a locale's CLDR rules need.
+
+A regional or script variant (pt-rBR, b+es+419) falls back to its parent
+locale's file the way Android resolves resources, so a variant only needs to
+define the strings that differ from its parent.
+
+The (kind, name) keys are interned once for all locales, and each locale's
+entries are summarized as an integer bitset over those key ids (its own, and
+resolved through its parents), so "which keys does locale Y lack" and "which
+locales lack key X" are bit operations. Base keys get the lowest ids, in base
+file order, so iterating a bitset yields keys in that order.
+"""
+
+import os
+import sys
+
+from plural_rules import missing_quantities
+from resource_xml import read_resources, read_strings
+
+RES_PATH = 'app/src/main/res'
+BASE_STRINGS_FILE = os.path.join(RES_PATH, 'values', 'strings.xml')
+
+# Regional variants written in a different script than their language's
+# default, which Android therefore never resolves through the language file
+NO_PARENT_FALLBACK = {'zh-rHK', 'zh-rTW', 'pa-rPK'}
+
+
+def get_locale_from_path(path):
+    """Returns the locale qualifier of a values-*/strings.xml path, or None for the base file."""
+    parts = os.path.normpath(path).split(os.sep)
+    for part in parts:
+        if part.startswith('values-'):
+            return part.split('values-', 1)[1]
+    return None
+
+
+def parent_locale(locale):
+    """Returns the locale a variant falls back to (pt-rBR -> pt, b+es+419 -> es), or None."""
+    if locale in NO_PARENT_FALLBACK:
+        return None
+    if locale.startswith('b+'):
+        parts = locale.split('+')
+        if len(parts) <= 2:
+            return None
+        return parts[1] if len(parts) == 3 else '+'.join(parts[:-1])
+    if '-r' in locale:
+        return locale.split('-r', 1)[0]
+    return None
+
+
+def parent_locales(locale):
+    """Returns every locale a locale falls back to, nearest first (b+es+419 -> ['es'])."""
+    parents = []
+    parent = parent_locale(locale)
+    while parent:
+        parents.append(parent)
+        parent = parent_locale(parent)
+    return parents
+
+
+def fallback_paths(file_path):
+    """Returns the existing strings.xml files a locale file falls back to, nearest parent first."""
+    res_path = os.path.dirname(os.path.dirname(file_path))
+    paths = []
+    locale = parent_locale(get_locale_from_path(file_path) or '')
+    while locale:
+        path = os.path.join(res_path, f'values-{locale}', 'strings.xml')
+        if os.path.exists(path):
+            paths.append(path)
+        locale = parent_locale(locale)
+    return paths
+
+
+def resolve_strings(file_path):
+    """Returns a locale's strings merged over those of its parent locales (not the base file)."""
+    resolved = {}
+    for path in reversed(fallback_paths(file_path)):
+        resolved.update(parse_strings(path))
+    resolved.update(parse_strings(file_path))
+    return resolved
+
+
+def resolve_resources(file_path):
+    """Like resolve_strings, for every entry kind: {(kind, name): value}."""
+    resolved = {}
+    for path in reversed(fallback_paths(file_path)):
+        resolved.update(parse_resources(path))
+    resolved.update(parse_resources(file_path))
+    return resolved
+
+
+def find_string_files(res_path=RES_PATH):
+    """Returns every strings.xml below res_path, sorted for a stable processing order."""
+    string_files = []
+    for dirpath, _, filenames in os.walk(res_path):
+        for filename in filenames:
+            if filename == 'strings.xml':
+                string_files.append(os.path.join(dirpath, filename))
+    return sorted(string_files)
+
+
+def parse_strings(file_path):
+    """Parses a strings.xml file and returns an ordered dictionary of string name -> raw value."""
+    return read_strings(file_path)
+
+
+def iter_bits(bits):
+    """Yields the indices of the set bits of an int, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def parse_resources(file_path):
+    """Parses a strings.xml file into {(kind, name): value} for its strings, plurals and string-arrays."""
+    return read_resources(file_path)
+
+
+class StringsCatalog:
+    """Base strings plus every locale's strings, each file parsed exactly once."""
+
+    def __init__(self, res_path=RES_PATH):
+        self.res_path = res_path
+        self.base_path = os.path.join(res_path, 'values', 'strings.xml')
+        self.base = parse_strings(self.base_path)
+        self.paths = {}
+        self._locales = {}
+        self._base_resources = None
+        self._base_bits = 0
+        self._resources = {}
+        self._keys = []
+        self._key_ids = {}
+        self._presence = {}
+        self._resolved_presence = {}
+        for string_file in find_string_files(res_path):
+            locale = get_locale_from_path(string_file)
+            if locale:
+                self.paths[locale] = string_file
+
+    def locales(self):
+        return sorted(self.paths)
+
+    def strings(self, locale):
+        """Returns the name -> value map of a locale, parsing its file on first use."""
+        if locale not in self._locales:
+            self._locales[locale] = parse_strings(self.paths[locale])
+        return self._locales[locale]
+
+    def _parent(self, locale):
+        parent = parent_locale(locale)
+        while parent and parent not in self.paths:
+            parent = parent_locale(parent)
+        return parent
+
+    def resolved(self, locale):
+        """Returns the locale's strings merged over those of the parent locales it falls back to."""
+        parent = self._parent(locale)
+        if not parent:
+            return self.strings(locale)
+        return {**self.resolved(parent), **self.strings(locale)}
+
+    def missing(self, locale):
+        """Returns the base strings (name -> English value) neither the locale nor its parents define."""
+        return {name: self.base[name] for kind, name in self.missing_keys(locale) if kind == 'string'}
+
+    def extra(self, locale):
+        """Returns the names defined by the locale that no longer exist in the base file."""
+        return [name for name in self.strings(locale) if name not in self.base]
+
+    def _intern(self, resources):
+        """Re-keys a parsed file by the shared key tuples, assigning ids to keys seen for the first time."""
+        interned = {}
+        for key, value in resources.items():
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = len(self._keys)
+                key = (key[0], sys.intern(key[1]))
+                self._keys.append(key)
+                self._key_ids[key] = key_id
+            interned[self._keys[key_id]] = value
+        return interned
+
+    def _bits(self, keys):
+        bits = 0
+        for key in keys:
+            bits |= 1 << self._key_ids[key]
+        return bits
+
+    def _load_base(self):
+        # The base keys are interned first, so they take the lowest ids
+        if self._base_resources is None:
+            self._base_resources = self._intern(parse_resources(self.base_path))
+            self._base_bits = self._bits(self._base_resources)
+
+    @property
+    def base_resources(self):
+        """Returns {(kind, name): value} of the base file, parsed on first use."""
+        self._load_base()
+        return self._base_resources
+
+    def resources(self, locale):
+        """Returns the (kind, name) -> value map of a locale, parsing its file on first use."""
+        if locale not in self._resources:
+            self._load_base()
+            self._resources[locale] = self._intern(parse_resources(self.paths[locale]))
+        return self._resources[locale]
+
+    def presence(self, locale):
+        """Returns the bitset of the key ids a locale's own file defines."""
+        if locale not in self._presence:
+            self._presence[locale] = self._bits(self.resources(locale))
+        return self._presence[locale]
+
+    def resolved_presence(self, locale):
+        """Returns the bitset of the key ids a locale defines itself or through its parent locales."""
+        if locale not in self._resolved_presence:
+            parent = self._parent(locale)
+            bits = self.presence(locale)
+            if parent:
+                bits |= self.resolved_presence(parent)
+            self._resolved_presence[locale] = bits
+        return self._resolved_presence[locale]
+
+    def _missing_bits(self, locale):
+        self._load_base()
+        return self._base_bits & ~self.resolved_presence(locale)
+
+    def missing_keys(self, locale):
+        """Returns the base (kind, name) keys neither the locale nor its parents define, in base order."""
+        return [self._keys[key_id] for key_id in iter_bits(self._missing_bits(locale))]
+
+    def missing_count(self, locale):
+        return self._missing_bits(locale).bit_count()
+
+    def extra_keys(self, locale):
+        """Returns the (kind, name) keys a locale's own file defines that the base file does not."""
+        self._load_base()
+        return [self._keys[key_id] for key_id in iter_bits(self.presence(locale) & ~self._base_bits)]
+
+    def locales_missing(self, key):
+        """Returns the locales that neither define a base key nor inherit it from a parent."""
+        self._load_base()
+        key_id = self._key_ids.get(key)
+        if key_id is None or not self._base_bits >> key_id & 1:
+            return []
+        return [locale for locale in self.locales() if not self.resolved_presence(locale) >> key_id & 1]
+
+    def resolved_resources(self, locale):
+        """Returns the locale's entries merged over those of its parent locales; plurals resolve whole."""
+        parent = self._parent(locale)
+        if not parent:
+            return self.resources(locale)
+        return {**self.resolved_resources(parent), **self.resources(locale)}
+
+    def missing_resources(self, locale):
+        """Returns the base entries ((kind, name) -> English value) neither the locale nor its parents define."""
+        return {key: self.base_resources[key] for key in self.missing_keys(locale)}
+
+    def missing_quantities(self, locale):
+        """Returns {name: [quantity, ...]} for the base plurals the locale resolves without every CLDR category."""
+        resolved = self.resolved_resources(locale)
+        missing = {}
+        for (kind, name) in self.base_resources:
+            if kind == 'plurals' and (kind, name) in resolved:
+                quantities = missing_quantities(locale, resolved[(kind, name)])
+                if quantities:
+                    missing[name] = quantities
+        return missing
+
+    def reload(self, locale):
+        """Drops the cached parse of a locale, e.g. after its file has been rewritten."""
+        self._locales.pop(locale, None)
+        self._resources.pop(locale, None)
+        self._presence.pop(locale, None)
+        # Variants resolve through this locale
+        self._resolved_presence = {}
+
+    def reload_base(self):
+        """Parses the base file again, e.g. after it has been edited."""
+        self.base = parse_strings(self.base_path)
+        # Keys are renumbered so the base keys keep the lowest ids, in their new order
+        self._base_resources = None
+        self._base_bits = 0
+        self._resources = {}
+        self._keys = []
+        self._key_ids = {}
+        self._presence = {}
+        self._resolved_presence = {}
@@ -0,0 +1,47 @@
+from content_cache import ContentHashCache
+from extract_hardcoded_strings import find_candidates, kotlin_to_resource, plan, rewrite_file, scan
+from write_batch import WriteBatch
+
+
+def _extract(tmp_path, source):
+    path = tmp_path / 'Screen.kt'
+    path.write_bytes(source.encode('utf-8'))
+    results = scan([path], ContentHashCache(str(tmp_path / 'cache.json')))
+    _, rewrites, skipped = plan(results, {})
+    with WriteBatch() as batch:
+        for file_path, file_rewrites in rewrites.items():
+            rewrite_file(file_path, file_rewrites, batch)
+    return path.read_bytes().decode('utf-8'), skipped
+
+
+def test_crlf_file_is_rewritten_at_the_right_offsets(tmp_path):
+    source = ('package a\r\n\r\nimport b.C\r\n\r\n'
+              '@Composable\r\nfun A() {\r\n    Column {\r\n        Text("Hello there")\r\n    }\r\n}\r\n')
+    text, _ = _extract(tmp_path, source)
+    assert text == ('package a\r\n\r\nimport b.C\r\n'
+                    'import androidx.compose.ui.res.stringResource\r\n'
+                    'import com.contacts.android.contacts.R\r\n\r\n'
+                    '@Composable\r\nfun A() {\r\n    Column {\r\n'
+                    '        Text(stringResource(R.string.hello_there))\r\n    }\r\n}\r\n')
+
+
+def test_imports_go_below_the_package_line(tmp_path):
+    text, _ = _extract(tmp_path, 'package a\n\nfun A() {\n    Text("Hi")\n}\n')
+    assert text == ('package a\n\n'
+                    'import androidx.compose.ui.res.stringResource\n'
+                    'import com.contacts.android.contacts.R\n\n'
+                    'fun A() {\n    Text(stringResource(R.string.hi))\n}\n')
+
+
+def test_concatenated_literals_are_left_for_manual_rewrite(tmp_path):
+    source = 'package a\n\nfun A() {\n    Text(text = "Email\\n" + "Phone")\n}\n'
+    text, skipped = _extract(tmp_path, source)
+    assert text == source
+    assert [reason for _, _, reason in skipped] == ['joined with +, needs manual rewrite']
+    assert not find_candidates('Text(name + "x")')
+
+
+def test_surrounding_spaces_are_quoted():
+    assert kotlin_to_resource(' / year') == '" / year"'
+    assert kotlin_to_resource('a  b') == '"a  b"'
+    assert kotlin_to_resource("Don't") == "Don\\'t"
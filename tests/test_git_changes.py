@@ -0,0 +1,73 @@
+import subprocess
+
+import pytest
+
+from git_changes import ChangeSet
+
+STRINGS = '<resources>\n{}</resources>\n'
+
+
+def _strings(path, **values):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(STRINGS.format(''.join(f'    <string name="{name}">{value}</string>\n'
+                                           for name, value in values.items())), encoding='utf-8')
+
+
+def _git(*args):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com', *args],
+                   check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _git('init', '-q')
+    res = tmp_path / 'res'
+    _strings(res / 'values' / 'strings.xml', a='A', b='B')
+    for locale in ['fr', 'it', 'pt', 'pt-rBR']:
+        _strings(res / f'values-{locale}' / 'strings.xml', a=locale)
+    _git('add', '.')
+    _git('commit', '-q', '-m', 'base')
+    return res
+
+
+def _pairs(*locales):
+    return [(locale, f'res/values-{locale}/strings.xml') for locale in locales]
+
+
+def test_since_covers_edited_untracked_and_deleted_files(repo):
+    _strings(repo / 'values' / 'strings.xml', a='A2', b='B', c='C')
+    _strings(repo / 'values-fr' / 'strings.xml', a='fr2')
+    _strings(repo / 'values-de' / 'strings.xml', a='de')
+    (repo / 'values-pt' / 'strings.xml').unlink()
+
+    changes = ChangeSet('HEAD', res_path='res')
+    assert changes.locales == {'fr', 'de', 'pt'}
+    assert changes.base_changed
+    assert changes.base_keys() == {('string', 'a'), ('string', 'c')}
+    full, partial = changes.affected(_pairs('de', 'fr', 'it', 'pt-rBR'))
+    # pt-rBR lost the parent it fell back to
+    assert full == _pairs('de', 'fr', 'pt-rBR')
+    assert partial == _pairs('it')
+    assert changes.changed_files(_pairs('de', 'fr', 'it', 'pt-rBR')) == _pairs('de', 'fr')
+
+
+def test_since_sees_both_sides_of_a_rename(repo):
+    _git('mv', 'res/values-pt', 'res/values-it-rCH')
+    changes = ChangeSet('HEAD', res_path='res')
+    assert changes.locales == {'pt', 'it-rCH'}
+    assert not changes.base_changed
+    assert changes.affected(_pairs('fr', 'it', 'it-rCH', 'pt-rBR')) == (_pairs('it-rCH', 'pt-rBR'), [])
+
+
+def test_staged_ignores_unstaged_edits(repo):
+    _strings(repo / 'values' / 'strings.xml', a='A', b='B2')
+    _strings(repo / 'values-fr' / 'strings.xml', a='fr2')
+    _git('add', 'res/values')
+    _strings(repo / 'values' / 'strings.xml', a='A3', b='B2')
+    _strings(repo / 'values-de' / 'strings.xml', a='de')
+
+    changes = ChangeSet(staged=True, res_path='res')
+    assert changes.locales == set()
+    assert changes.base_keys() == {('string', 'b')}
+    assert changes.affected(_pairs('fr', 'de')) == ([], _pairs('fr', 'de'))
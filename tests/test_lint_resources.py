@@ -0,0 +1,40 @@
+from lint_resources import lint_file
+from locale_batch import filter_dirs
+from validate_resources import validate_file
+
+
+def test_placeholder_rule_respects_formatted_false(tmp_path):
+    path = tmp_path / 'strings.xml'
+    path.write_text('<resources>\n'
+                    '    <string name="raw" formatted="false">%s of %s</string>\n'
+                    '    <string name="bad">%s of %s</string>\n'
+                    '</resources>\n', encoding='utf-8')
+    lint_names = [finding['name'] for finding in lint_file('fr', str(path), ['non-positional-placeholders'])]
+    assert lint_names == ['bad']
+    assert len(validate_file('fr', str(path), {})) == 1
+
+
+def test_filter_dirs():
+    pairs = [(None, 'res/values/strings.xml'), ('fr', 'res/values-fr/strings.xml'), ('de', 'res/values-de/strings.xml')]
+    assert filter_dirs(pairs, []) == pairs
+    assert filter_dirs(pairs, ['res/values-fr/', 'values']) == pairs[:2]
+
+
+def test_apostrophes_inside_markup_are_not_flagged(tmp_path):
+    path = tmp_path / 'strings.xml'
+    path.write_text('<resources>\n'
+                    '    <string name="count"><xliff:g id=\'n\'>%s</xliff:g> items</string>\n'
+                    '    <string name="bad"><b>Don\'t</b></string>\n'
+                    '</resources>\n', encoding='utf-8')
+    findings = lint_file('fr', str(path), ['unescaped-apostrophe'])
+    assert [(finding['name'], finding['line']) for finding in findings] == [('bad', 3)]
+
+
+def test_validate_accepts_markup_attributes(tmp_path):
+    path = tmp_path / 'strings.xml'
+    path.write_text('<resources>\n'
+                    '    <string name="count"><xliff:g id=\'n\' example="5">%1$s</xliff:g> items</string>\n'
+                    '    <string name="bad">l\'<b>ami</b></string>\n'
+                    '</resources>\n', encoding='utf-8')
+    errors = validate_file('fr', str(path), {})
+    assert len(errors) == 1 and "'bad': Unescaped apostrophe" in errors[0]
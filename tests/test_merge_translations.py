@@ -0,0 +1,41 @@
+from merge_translations import diff, merge_resources
+from resource_xml import ResourceFile
+
+ORDER = [('string', 'a'), ('plurals', 'p'), ('string', 'b'), ('string', 'c')]
+LOCALE = ('<resources>\n'
+          '    <string name="a">A</string>\n'
+          '    <plurals name="p">\n'
+          '        <item quantity="other">P</item>\n'
+          '    </plurals>\n'
+          '    <string name="old">Old</string>\n'
+          '</resources>\n')
+NEW = {('string', 'b'): 'B', ('string', 'c'): 'C', ('plurals', 'p'): {'one': 'P1', 'other': 'ignored'}}
+
+
+def test_diff():
+    entries = ResourceFile(LOCALE).entries()
+    assert diff(ORDER, entries) == ([('string', 'b'), ('string', 'c')], [('string', 'old')])
+
+
+def test_merge_inserts_in_base_order_and_is_idempotent(tmp_path):
+    path = str(tmp_path / 'strings.xml')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(LOCALE)
+
+    assert merge_resources(path, NEW, path, order=ORDER)
+    with open(path, encoding='utf-8') as f:
+        merged = f.read()
+    assert merged == ('<resources>\n'
+                      '    <string name="a">A</string>\n'
+                      '    <plurals name="p">\n'
+                      '        <item quantity="one">P1</item>\n'
+                      '        <item quantity="other">P</item>\n'
+                      '    </plurals>\n'
+                      '    <string name="old">Old</string>\n'
+                      '    <string name="b">B</string>\n'
+                      '    <string name="c">C</string>\n'
+                      '</resources>\n')
+
+    assert not merge_resources(path, NEW, path, order=ORDER)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == merged
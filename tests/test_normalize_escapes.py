@@ -0,0 +1,32 @@
+import pytest
+
+from normalize_escapes import normalize_value
+
+
+@pytest.mark.parametrize('raw', [
+    '100% sure, %s',
+    'Save 50% or more on %d items',
+    'Battery 50% saved',
+    '100%% of %s',
+])
+def test_literal_percent_is_left_alone(raw):
+    assert normalize_value(raw) == raw
+
+
+def test_several_arguments_are_numbered():
+    assert normalize_value('%s sent %d files, 100%% done') == '%1$s sent %2$d files, 100%% done'
+
+
+def test_unformatted_strings_are_not_numbered():
+    assert normalize_value('%s and %s', formatted=False) == '%s and %s'
+
+
+@pytest.mark.parametrize('raw, canonical', [
+    ("Don't", "Don\\'t"),
+    ('Don&#39;t', "Don\\'t"),
+    ('\\&quot;x\\&quot;', '\\"x\\"'),
+    ('a\\qb', 'aqb'),
+])
+def test_escapes(raw, canonical):
+    assert normalize_value(raw) == canonical
+    assert normalize_value(canonical) == canonical
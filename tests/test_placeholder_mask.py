@@ -0,0 +1,33 @@
+import pytest
+
+from placeholder_mask import PlaceholderError, format_specifiers, mask, unmask
+
+
+@pytest.mark.parametrize('text', ['Save 50% off', '100% sure', 'Battery 50% saved'])
+def test_literal_percent_is_not_a_specifier(text):
+    assert format_specifiers(text) == []
+    assert mask(text) == (text, [])
+
+
+def test_escaped_percent_is_masked_but_not_a_specifier():
+    assert mask('100%% sure') == ('100⟦0⟧ sure', ['%%'])
+    assert format_specifiers('100%% sure, %s') == ['%s']
+
+
+def test_specifiers():
+    assert format_specifiers('%1$s sent %2$d files (%.2f MB)') == ['%1$s', '%2$d', '%.2f']
+
+
+def test_round_trip():
+    text = "Delete %1$d contacts from &quot;%2$s&quot;?\\n<b>Can\\'t</b> undo"
+    masked, tokens = mask(text)
+    assert '%' not in masked and '&' not in masked and '<' not in masked
+    assert unmask(masked, tokens) == text
+
+
+def test_unmask_rejects_lost_or_duplicated_tokens():
+    masked, tokens = mask('%1$s and %2$s')
+    with pytest.raises(PlaceholderError):
+        unmask(masked.replace('⟦1⟧', ''), tokens)
+    with pytest.raises(PlaceholderError):
+        unmask(masked + ' ⟦0⟧', tokens)
@@ -0,0 +1,57 @@
+from merge_translations import merge_resources
+from plural_rules import categories, for_locale, missing_quantities
+from strings_catalog import StringsCatalog
+
+RU = ('<resources>\n'
+      '    <plurals name="files">\n'
+      '        <item quantity="one">%d файл</item>\n'
+      '        <item quantity="other">%d файла</item>\n'
+      '    </plurals>\n'
+      '</resources>\n')
+
+
+def test_categories_follow_the_language():
+    assert categories('ru') == {'one', 'few', 'many', 'other'}
+    assert categories('pt-rBR') == categories('b+pt+BR') == {'one', 'many', 'other'}
+    assert categories('ja') == {'other'}
+    assert categories('oc') == {'one', 'other'}
+    assert categories(None) == {'one', 'other'}
+
+
+def test_missing_quantities_in_cldr_order():
+    assert missing_quantities('ru', {'other': '', 'one': ''}) == ['few', 'many']
+    assert missing_quantities('ar', {'other': ''}) == ['zero', 'one', 'two', 'few', 'many']
+    assert missing_quantities('ja', {'one': '', 'other': ''}) == []
+
+
+def test_for_locale_fills_categories_from_other():
+    assert for_locale('ru', {'one': '%d file', 'other': '%d files'}) == {
+        'one': '%d file', 'few': '%d files', 'many': '%d files', 'other': '%d files'}
+    assert for_locale('ja', {'one': '%d file', 'other': '%d files'}) == {'other': '%d files'}
+
+
+def test_merge_adds_only_the_missing_quantities(tmp_path):
+    path = str(tmp_path / 'strings.xml')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(RU)
+    value = for_locale('ru', {'one': 'ONE', 'other': 'OTHER'})
+    assert merge_resources(path, {('plurals', 'files'): value}, path, order=[('plurals', 'files')])
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == ('<resources>\n'
+                            '    <plurals name="files">\n'
+                            '        <item quantity="one">%d файл</item>\n'
+                            '        <item quantity="few">OTHER</item>\n'
+                            '        <item quantity="many">OTHER</item>\n'
+                            '        <item quantity="other">%d файла</item>\n'
+                            '    </plurals>\n'
+                            '</resources>\n')
+
+
+def test_catalog_reports_missing_quantities(tmp_path):
+    for directory, content in [('values', RU.replace('файла', 'files').replace('файл', 'file')), ('values-ru', RU),
+                               ('values-ja', RU)]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    catalog = StringsCatalog(str(tmp_path))
+    assert catalog.missing_quantities('ru') == {'files': ['few', 'many']}
+    assert catalog.missing_quantities('ja') == {}
@@ -0,0 +1,30 @@
+from resource_usage import scan_file
+
+KOTLIN = '''package a
+
+// Text(stringResource(R.string.old_title))
+/* R.string.draft
+   /* nested R.plurals.gone */ R.array.still_comment */
+@Composable
+fun A() {
+    Text(stringResource(R.string.title))
+    Text("${stringResource(R.plurals.count, 2)} // R.string.not_a_comment")
+    val url = "http://example.com" // R.string.trailing
+}
+'''
+LAYOUT = '''<LinearLayout>
+    <!-- <TextView android:text="@string/hidden" /> -->
+    <TextView android:text="@string/shown" />
+</LinearLayout>
+'''
+
+
+def test_references_in_comments_are_not_uses(tmp_path):
+    path = tmp_path / 'A.kt'
+    path.write_text(KOTLIN, encoding='utf-8')
+    assert scan_file(str(path)) == {'refs': [['string', 'title', 8], ['plurals', 'count', 9],
+                                             ['string', 'not_a_comment', 9]], 'dynamic': False}
+
+    path = tmp_path / 'layout.xml'
+    path.write_text(LAYOUT, encoding='utf-8')
+    assert scan_file(str(path))['refs'] == [['string', 'shown', 3]]
@@ -0,0 +1,23 @@
+from resource_xml import ResourceFile
+
+BASE = '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n    <!-- kept -->\n    <string name="a">A</string>\n</resources>\n'
+
+
+def test_unedited_file_is_unchanged():
+    assert ResourceFile(BASE).serialize() == BASE
+
+
+def test_append_keeps_one_entry_per_line():
+    resources = ResourceFile(BASE)
+    resources.append_string('b', 'B')
+    resources.append_string('c', 'C')
+    assert resources.serialize().endswith('    <string name="b">B</string>\n    <string name="c">C</string>\n</resources>\n')
+
+
+def test_append_when_closing_tag_shares_a_line():
+    resources = ResourceFile('<resources>\n    <plurals name="p">\n        <item quantity="other">x</item>\n'
+                             '    </plurals></resources>\n')
+    resources.append_string('b', 'B')
+    resources.append_string('c', 'C')
+    assert resources.serialize().endswith('    </plurals>\n    <string name="b">B</string>\n'
+                                          '    <string name="c">C</string>\n</resources>\n')
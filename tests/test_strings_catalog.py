@@ -0,0 +1,59 @@
+from strings_catalog import StringsCatalog
+
+BASE = ('<resources>\n'
+        '    <string name="a">A</string>\n'
+        '    <plurals name="p">\n'
+        '        <item quantity="other">P</item>\n'
+        '    </plurals>\n'
+        '    <string name="b">B</string>\n'
+        '    <string-array name="list">\n'
+        '        <item>x</item>\n'
+        '    </string-array>\n'
+        '</resources>\n')
+FILES = {
+    'values-pt': '<resources>\n    <string name="b">Bp</string>\n    <string name="gone">G</string>\n</resources>\n',
+    'values-pt-rBR': '<resources>\n    <string name="a">Ab</string>\n</resources>\n',
+    'values-fr': '<resources>\n    <string name="a">Af</string>\n    <string name="b">Bf</string>\n</resources>\n',
+}
+
+
+def _catalog(tmp_path):
+    for directory, content in [('values', BASE), *FILES.items()]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    return StringsCatalog(str(tmp_path))
+
+
+def test_missing_keys_follow_base_order_and_fallback(tmp_path):
+    catalog = _catalog(tmp_path)
+    assert catalog.missing_keys('pt') == [('string', 'a'), ('plurals', 'p'), ('string-array', 'list')]
+    assert catalog.missing_keys('pt-rBR') == [('plurals', 'p'), ('string-array', 'list')]
+    assert catalog.missing_count('fr') == 2
+    assert catalog.missing('pt') == {'a': 'A'}
+    assert list(catalog.missing_resources('pt-rBR')) == catalog.missing_keys('pt-rBR')
+    assert catalog.extra_keys('pt') == [('string', 'gone')]
+
+
+def test_locales_missing(tmp_path):
+    catalog = _catalog(tmp_path)
+    assert catalog.locales_missing(('string', 'a')) == ['pt']
+    assert catalog.locales_missing(('string', 'b')) == []
+    assert catalog.locales_missing(('plurals', 'p')) == ['fr', 'pt', 'pt-rBR']
+    assert catalog.locales_missing(('string', 'gone')) == []
+
+
+def test_keys_are_shared_across_locales(tmp_path):
+    catalog = _catalog(tmp_path)
+    fr_key = next(iter(catalog.resources('fr')))
+    base_key = next(iter(catalog.base_resources))
+    assert fr_key is base_key
+
+
+def test_reload_updates_variants(tmp_path):
+    catalog = _catalog(tmp_path)
+    assert catalog.missing_count('pt-rBR') == 2
+    (tmp_path / 'values-pt' / 'strings.xml').write_text(
+        '<resources>\n    <string-array name="list">\n        <item>y</item>\n    </string-array>\n</resources>\n',
+        encoding='utf-8')
+    catalog.reload('pt')
+    assert catalog.missing_keys('pt-rBR') == [('plurals', 'p'), ('string', 'b')]
@@ -0,0 +1,43 @@
+from strings_catalog import StringsCatalog
+from translate_strings import translate_and_update
+from translation_backend import FakeBackend, TranslationMemory
+from translation_lock import TranslationLock
+
+BASE = ('<resources>\n'
+        '    <string name="a">A %1$s</string>\n'
+        '    <plurals name="files">\n'
+        '        <item quantity="one">%d file</item>\n'
+        '        <item quantity="other">%d files</item>\n'
+        '    </plurals>\n'
+        '    <string-array name="days">\n'
+        '        <item>Mon</item>\n'
+        '        <item>Tue</item>\n'
+        '    </string-array>\n'
+        '    <string name="c">C</string>\n'
+        '</resources>\n')
+DE = '<resources>\n    <string name="c">Ce</string>\n</resources>\n'
+
+
+def test_missing_entries_are_merged_in_base_order(tmp_path):
+    for directory, content in [('values', BASE), ('values-de', DE)]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    catalog = StringsCatalog(str(tmp_path))
+    lock = TranslationLock(None)
+
+    translate_and_update(catalog, ['de'], FakeBackend(), TranslationMemory(), lock=lock)
+    assert (tmp_path / 'values-de' / 'strings.xml').read_text(encoding='utf-8') == (
+        '<resources>\n'
+        '    <string name="a">[de] A %1$s</string>\n'
+        '    <plurals name="files">\n'
+        '        <item quantity="one">[de] %d file</item>\n'
+        '        <item quantity="other">[de] %d files</item>\n'
+        '    </plurals>\n'
+        '    <string-array name="days">\n'
+        '        <item>[de] Mon</item>\n'
+        '        <item>[de] Tue</item>\n'
+        '    </string-array>\n'
+        '    <string name="c">Ce</string>\n'
+        '</resources>\n')
+    assert sorted(lock.entries['de']) == ['a', 'days[0]', 'days[1]', 'files[one]', 'files[other]']
+    assert catalog.missing_keys('de') == []
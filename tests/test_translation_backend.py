@@ -0,0 +1,41 @@
+import asyncio
+
+from placeholder_mask import mask, unmask
+from resource_xml import escape_text
+from translation_backend import FakeBackend, TranslationMemory, locale_code, translate_missing
+
+
+def test_locale_code():
+    assert locale_code('pt-rBR') == 'pt'
+    assert locale_code('b+es+419') == 'es'
+    assert locale_code('fr') == 'fr'
+
+
+def test_translate_missing_sends_each_text_once():
+    backend = FakeBackend()
+    memory = TranslationMemory()
+    missing = {'fr': {'a': 'Hello', 'b': 'Hello', 'c': 'Bye'}, 'pt-rBR': {'a': 'Hello'}}
+    results, errors = asyncio.run(translate_missing(backend, missing, memory))
+    assert errors == []
+    assert results == {'fr': {'a': '[fr] Hello', 'b': '[fr] Hello', 'c': '[fr] Bye'}, 'pt-rBR': {'a': '[pt] Hello'}}
+    assert backend.calls == 2
+
+    # Everything is in the memory now, so nothing is sent again
+    results, _ = asyncio.run(translate_missing(backend, missing, memory))
+    assert results['fr']['c'] == '[fr] Bye'
+    assert backend.calls == 2
+
+
+def test_translation_memory_round_trip(tmp_path):
+    path = str(tmp_path / 'memory.json')
+    memory = TranslationMemory(path)
+    memory.put('Hello', 'fr', 'Bonjour')
+    memory.save()
+    assert TranslationMemory(path).get('Hello', 'fr') == 'Bonjour'
+
+
+def test_masked_text_survives_translation():
+    source = "Delete %1$d contacts from &quot;%2$s&quot;? It can\\'t be undone."
+    masked, tokens = mask(source)
+    [translated] = asyncio.run(FakeBackend().translate_batch([masked], 'fr'))
+    assert unmask(escape_text(translated), tokens) == '[fr] ' + source
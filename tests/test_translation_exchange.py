@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from content_cache import text_hash
+from strings_catalog import StringsCatalog
+from translation_exchange import export_file, export_rows, import_rows, read_rows
+
+BASE = ('<resources>\n'
+        '    <string name="hello">Hello</string>\n'
+        '    <plurals name="files">\n'
+        '        <item quantity="one">%d file</item>\n'
+        '        <item quantity="other">%d files</item>\n'
+        '    </plurals>\n'
+        '    <string name="bye">Bye</string>\n'
+        '</resources>\n')
+DE = '<resources>\n    <string name="bye">Tschüss</string>\n</resources>\n'
+
+
+def _catalog(tmp_path):
+    for directory, content in [('values', BASE), ('values-de', DE)]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    return StringsCatalog(str(tmp_path))
+
+
+def _write(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+
+def test_export_keeps_filled_targets(tmp_path):
+    catalog = _catalog(tmp_path)
+    path = str(tmp_path / 'rows.jsonl')
+    assert export_file(export_rows(catalog, ['de']), path) == 3
+    rows = list(read_rows(path))
+    assert [(row['key'], row.get('quantity')) for row in rows] == [('hello', None), ('files', 'one'), ('files', 'other')]
+    rows[0]['target'] = 'Hallo'
+    _write(path, rows)
+
+    export_file(export_rows(catalog, ['de']), path)
+    assert [row['target'] for row in read_rows(path)] == ['Hallo', '', '']
+    mtime = os.stat(path).st_mtime_ns
+    export_file(export_rows(catalog, ['de']), path)
+    assert os.stat(path).st_mtime_ns == mtime
+
+
+def test_failed_export_leaves_the_file_untouched(tmp_path):
+    catalog = _catalog(tmp_path)
+    path = tmp_path / 'rows.jsonl'
+
+    def rows():
+        yield from export_rows(catalog, ['de'])
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        export_file(rows(), str(path))
+    assert not path.exists()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_import_applies_current_targets_only(tmp_path):
+    catalog = _catalog(tmp_path)
+    rows = list(export_rows(catalog, ['de']))
+    for row in rows:
+        row['target'] = "Geht's" if row['key'] == 'hello' else f"%d Datei ({row['quantity']})"
+    stale = dict(rows[0], source_hash=text_hash('Hi'))
+    existing = {'locale': 'de', 'kind': 'string', 'key': 'bye', 'source': 'Bye', 'source_hash': text_hash('Bye'),
+                'target': 'Ciao'}
+
+    stats = import_rows(iter([stale] + rows + [existing]), catalog)
+    assert stats['applied'] == 3
+    assert stats['existing'] == 1
+    assert stats['stale'] == [stale]
+    assert (tmp_path / 'values-de' / 'strings.xml').read_text(encoding='utf-8') == (
+        '<resources>\n'
+        "    <string name=\"hello\">Geht\\'s</string>\n"
+        '    <plurals name="files">\n'
+        '        <item quantity="one">%d Datei (one)</item>\n'
+        '        <item quantity="other">%d Datei (other)</item>\n'
+        '    </plurals>\n'
+        '    <string name="bye">Tschüss</string>\n'
+        '</resources>\n')
+    assert list(export_rows(catalog, ['de'])) == []
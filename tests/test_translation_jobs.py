@@ -0,0 +1,57 @@
+import asyncio
+
+import translation_stub_server
+from strings_catalog import StringsCatalog
+from translation_backend import HttpBackend
+from translation_exchange import export_rows
+from translation_jobs import JobRunner, Journal, TokenBucket
+
+BASE = ('<resources>\n'
+        '    <string name="hello">Hello %1$s</string>\n'
+        '    <string name="sale">50% off</string>\n'
+        '    <string name="bye">Bye</string>\n'
+        '    <string name="yes">Yes</string>\n'
+        '</resources>\n')
+FR = ('<resources>\n'
+      '    <string name="yes">Oui</string>\n'
+      '</resources>\n')
+
+
+def _res(tmp_path):
+    for directory, content in [('values', BASE), ('values-fr', FR)]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    return StringsCatalog(str(tmp_path))
+
+
+def test_run_resumes_from_journal_against_stub_server(tmp_path):
+    catalog = _res(tmp_path)
+    rows = list(export_rows(catalog, ['fr']))
+    assert [row['key'] for row in rows] == ['hello', 'sale', 'bye']
+
+    # A previous run finished 'bye' before it was killed
+    journal = Journal(str(tmp_path / 'journal'))
+    journal.append([dict(rows[2], target='Au revoir')])
+
+    server = translation_stub_server.start(port=0, throttle=0.3, seed=1, retry_after=0.01)
+    try:
+        runner = JobRunner(catalog, HttpBackend(server.url), journal, TokenBucket(100), batch_size=1,
+                           base_delay=0.01)
+        stats = asyncio.run(runner.run(rows))
+        assert stats['resumed'] == 1
+        assert stats['translated'] == 2
+        assert stats['failed'] == 0
+        assert not (tmp_path / 'journal').exists()
+        assert server.counts[200] == 2
+        assert stats['retries'] == server.counts[429] > 0
+
+        fr = (tmp_path / 'values-fr' / 'strings.xml').read_text(encoding='utf-8')
+        assert '<string name="hello">[fr] Hello %1$s</string>' in fr
+        assert '<string name="sale">[fr] 50% off</string>' in fr
+        assert '<string name="bye">Au revoir</string>' in fr
+
+        # Nothing is left to translate
+        assert list(export_rows(catalog, ['fr'])) == []
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,45 @@
+from strings_catalog import StringsCatalog
+from translation_backend import FakeBackend, TranslationMemory
+from translation_lock import TranslationLock, check, retranslate, update
+
+BASE = ('<resources>\n'
+        '    <string name="hello">Hello</string>\n'
+        '    <plurals name="files">\n'
+        '        <item quantity="one">%d file</item>\n'
+        '        <item quantity="other">%d files</item>\n'
+        '    </plurals>\n'
+        '</resources>\n')
+DE = ('<resources>\n'
+      '    <string name="hello">Hallo</string>\n'
+      '    <plurals name="files">\n'
+      '        <item quantity="one">%d Datei</item>\n'
+      '        <item quantity="other">%d Dateien</item>\n'
+      '    </plurals>\n'
+      '</resources>\n')
+
+
+def _catalog(tmp_path):
+    for directory, content in [('values', BASE), ('values-de', DE)]:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    return StringsCatalog(str(tmp_path))
+
+
+def test_edited_source_makes_only_its_texts_stale(tmp_path):
+    catalog = _catalog(tmp_path)
+    lock = TranslationLock(str(tmp_path / 'lock.json'))
+    assert check(catalog, lock) == ([], {'de': 3})
+    assert update(catalog, lock) == 3
+    lock.save()
+
+    (tmp_path / 'values' / 'strings.xml').write_text(BASE.replace('%d files', '%d documents'), encoding='utf-8')
+    catalog = StringsCatalog(str(tmp_path))
+    lock = TranslationLock(str(tmp_path / 'lock.json'))
+    stale, untracked = check(catalog, lock)
+    assert stale == [('de', 'files[other]', 'plurals', 'files', 'other', '%d documents')]
+    assert untracked == {}
+
+    assert retranslate(catalog, lock, stale, FakeBackend(), TranslationMemory()) == 1
+    assert '<item quantity="other">[de] %d documents</item>' in (tmp_path / 'values-de' / 'strings.xml').read_text(
+        encoding='utf-8')
+    assert check(catalog, lock) == ([], {})
@@ -0,0 +1,26 @@
+from verify_translations import diff_locale
+
+BASE = ('<resources>\n'
+        '    <string name="a">A</string>\n'
+        '    <plurals name="p">\n'
+        '        <item quantity="other">P</item>\n'
+        '    </plurals>\n'
+        '    <string name="b">B</string>\n'
+        '</resources>\n')
+FILES = {
+    'values': BASE,
+    'values-pt': '<resources>\n    <string name="a">Ap</string>\n    <string name="old">O</string>\n</resources>\n',
+    'values-pt-rBR': '<resources>\n    <string name="b">Bb</string>\n</resources>\n',
+}
+
+
+def test_diff_locale_resolves_through_the_parent(tmp_path):
+    for directory, content in FILES.items():
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'strings.xml').write_text(content, encoding='utf-8')
+    res = str(tmp_path)
+    variant = str(tmp_path / 'values-pt-rBR' / 'strings.xml')
+    parent = str(tmp_path / 'values-pt' / 'strings.xml')
+    assert diff_locale('pt-rBR', variant, res) == {'missing': ['p'], 'extra': []}
+    assert diff_locale('pt', parent, res) == {'missing': ['p', 'b'], 'extra': ['old']}
+    assert diff_locale('pt', parent, res, {('string', 'b')}) == {'missing': ['b'], 'extra': ['old']}
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from write_batch import WriteBatch, remove_stale_temp_files, temp_path, write_file
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def _temp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+
+def test_unchanged_file_is_not_written(tmp_path):
+    path = str(tmp_path / 'strings.xml')
+    assert write_file(path, 'a')
+    mtime = os.stat(path).st_mtime_ns
+    assert not write_file(path, 'a')
+    assert os.stat(path).st_mtime_ns == mtime
+    assert WriteBatch().commit() == []
+
+
+def test_failed_commit_leaves_every_target_untouched(tmp_path):
+    first = str(tmp_path / 'strings.xml')
+    write_file(first, 'old')
+    batch = WriteBatch()
+    batch.write(first, 'new')
+    batch.write(str(tmp_path / 'values-fr' / 'strings.xml'), 'fr')
+    # values-fr cannot be created once the first file is staged
+    (tmp_path / 'values-fr').write_text('a file where a directory should be')
+    with pytest.raises(OSError):
+        batch.commit()
+    assert _read(first) == 'old'
+    assert _temp_files(tmp_path) == []
+
+
+def test_with_block_discards_on_error(tmp_path):
+    path = str(tmp_path / 'strings.xml')
+    with pytest.raises(RuntimeError):
+        with WriteBatch() as batch:
+            batch.write(path, 'new')
+            raise RuntimeError
+    assert not os.path.exists(path)
+    with WriteBatch() as batch:
+        batch.write(path, 'new')
+    assert _read(path) == 'new'
+
+
+def test_stale_temp_files_are_removed(tmp_path):
+    path = str(tmp_path / 'strings.xml')
+    # pid_max is at most 2**22, so this process cannot exist
+    stale = temp_path(path, pid=2 ** 22 + 1)
+    assert os.path.basename(stale) == f'.strings.xml.{2 ** 22 + 1}.tmp'
+    with open(stale, 'w') as f:
+        f.write('partial')
+    write_file(path, 'content')
+    assert _temp_files(tmp_path) == []
+    assert remove_stale_temp_files(path) == 0
@@ -1,52 +1,107 @@
 
-import json
-import xml.etree.ElementTree as ET
-from deep_translator import GoogleTranslator
-
-def translate_and_update(missing_translations_path, br_strings_path):
-    # Read the missing translations
-    with open(missing_translations_path, 'r') as f:
-        missing_translations = json.load(f)
-
-    # Prepare the translator
-    translator = GoogleTranslator(source='en', target='br')
-
-    # Read the existing Breton strings.xml
-    try:
-        tree = ET.parse(br_strings_path)
-        root = tree.getroot()
-    except FileNotFoundError:
-        root = ET.Element('resources')
-        tree = ET.ElementTree(root)
-
-    # Translate and add the missing strings
-    for name, text in missing_translations.items():
-        try:
-            # Handle placeholders like %s, %d, etc.
-            if '%' in text:
-                # The translator might mess up the placeholders, so we just copy the original text
-                translated_text = text
-            else:
-                translated_text = translator.translate(text)
-            
-            # Create a new string element
-            new_string = ET.Element('string', name=name)
-            new_string.text = translated_text
-            root.append(new_string)
-
-        except Exception as e:
-            print(f"Error translating '{text}': {e}")
-            # If translation fails, add the English text as a fallback
-            new_string = ET.Element('string', name=name)
-            new_string.text = text
-            root.append(new_string)
-
-    # Write the updated strings.xml
-    tree.write(br_strings_path, encoding='utf-8', xml_declaration=True)
+import argparse
+import asyncio
+
+from merge_translations import merge_resources
+from placeholder_mask import PlaceholderError, mask, unmask
+from plural_rules import for_locale
+from resource_xml import escape_text
+from strings_catalog import StringsCatalog
+from translation_backend import BACKENDS, FakeBackend, TranslationMemory, get_backend, translate_missing
+from translation_lock import TranslationLock, text_id
+from write_batch import WriteBatch
+
+def missing_entries(catalog, locale):
+    """Returns {(kind, name): value} of the base entries and plural quantities a locale lacks, plurals per CLDR category."""
+    entries = {(kind, name): for_locale(locale, value) if kind == 'plurals' else value
+               for (kind, name), value in catalog.missing_resources(locale).items()}
+    for name, quantities in catalog.missing_quantities(locale).items():
+        value = for_locale(locale, catalog.base_resources[('plurals', name)])
+        entries[('plurals', name)] = {quantity: value[quantity] for quantity in quantities}
+    return entries
+
+def entry_texts(kind, name, value):
+    """Yields (text_id, English text) for every text of an entry: its body, plural quantities or array items."""
+    if kind == 'plurals':
+        for quantity, text in value.items():
+            yield text_id(name, quantity), text
+    elif kind == 'string-array':
+        for index, text in enumerate(value):
+            yield text_id(name, index), text
+    else:
+        yield text_id(name), value
+
+def translated_value(kind, name, value, translations):
+    """Rebuilds an entry from {text_id: translation}; a text that failed to translate keeps its English."""
+    if kind == 'plurals':
+        return {quantity: translations.get(text_id(name, quantity), text) for quantity, text in value.items()}
+    if kind == 'string-array':
+        return [translations.get(text_id(name, index), text) for index, text in enumerate(value)]
+    return translations.get(text_id(name), value)
+
+def translate_and_update(catalog, locales, backend, memory, concurrency=8, lock=None):
+    # Collect every text the requested locales are missing (strings, plural quantities and
+    # array items), with placeholders, entities, escapes and markup masked so the translator
+    # cannot mangle them
+    entries_by_locale = {}
+    missing_by_locale = {}
+    tokens = {}
+    for locale in locales:
+        entries_by_locale[locale] = missing_entries(catalog, locale)
+        missing_by_locale[locale] = {}
+        for (kind, name), value in entries_by_locale[locale].items():
+            for text, english in entry_texts(kind, name, value):
+                if english:
+                    missing_by_locale[locale][text], tokens[english] = mask(english)
+
+    masked_translations, errors = asyncio.run(translate_missing(backend, missing_by_locale, memory, concurrency))
+    for locale, texts, e in errors:
+        print(f"Error translating {len(texts)} strings to {locale}: {e}")
+
+    translated = {}
+    for locale in locales:
+        translated[locale] = {}
+        for (kind, name), value in entries_by_locale[locale].items():
+            for text, english in entry_texts(kind, name, value):
+                if text not in masked_translations.get(locale, {}):
+                    continue
+                try:
+                    translated[locale][text] = unmask(escape_text(masked_translations[locale][text]), tokens[english])
+                except PlaceholderError as e:
+                    print(f"Placeholders lost translating '{text}' to {locale}: {e}")
+                    continue
+                if lock is not None:
+                    lock.record(locale, text, english)
+
+    # The missing entries are merged in base order, every locale in one batch; if
+    # translation failed, the English text is used as a fallback
+    batch = WriteBatch()
+    for locale in locales:
+        entries = {(kind, name): translated_value(kind, name, value, translated[locale])
+                   for (kind, name), value in entries_by_locale[locale].items()}
+        if entries:
+            path = catalog.paths[locale]
+            merge_resources(path, entries, path, order=catalog.base_resources, batch=batch)
+
+    # Write the updated strings.xml files
+    batch.commit()
+    for locale in locales:
+        catalog.reload(locale)
+        print(f"{locale} strings.xml updated successfully.")
+
+    memory.save()
+    if lock is not None:
+        lock.save()
 
 if __name__ == '__main__':
-    translate_and_update(
-        'missing_translations.json',
-        'app/src/main/res/values-br/strings.xml'
-    )
-    print("Breton strings.xml updated successfully.")
+    parser = argparse.ArgumentParser(description="Machine-translate the strings missing from one or more locales")
+    parser.add_argument('locales', nargs='*', default=['br'], help='locale qualifiers, e.g. br fr pt-rBR (default: br)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='google')
+    parser.add_argument('--concurrency', type=int, default=8, help='maximum batches in flight')
+    parser.add_argument('--memory', default='translation_memory.json', help='translation memory file')
+    parser.add_argument('--fake-latency', type=float, default=0.0, help='simulated seconds per batch for --backend fake')
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.fake_latency) if args.backend == 'fake' else get_backend(args.backend)
+    translate_and_update(StringsCatalog(), args.locales, backend, TranslationMemory(args.memory), args.concurrency,
+                         TranslationLock())
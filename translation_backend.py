@@ -0,0 +1,181 @@
+"""
+Machine-translation backends, a persistent translation memory and a batched,
+concurrency-bounded driver that fills many locales at once.
+
+deep_translator is only needed for the Google backend; the fake backend
+works offline for tests and benchmarks. The HTTP backend speaks a minimal
+JSON protocol, served locally by translation_stub_server.py.
+"""
+
+import asyncio
+import json
+import os
+import urllib.error
+import urllib.request
+
+from write_batch import write_file
+
+DEFAULT_HTTP_URL = 'http://127.0.0.1:8765/translate'
+
+
+class RetryableError(Exception):
+    """A failed request that may succeed later: throttling, a server error or a network failure."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TranslationBackend:
+    """Translates batches of English strings into one target locale."""
+
+    name = 'base'
+    max_batch = 50
+
+    async def translate_batch(self, texts, target, source='en'):
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate through deep_translator, run in worker threads."""
+
+    name = 'google'
+
+    async def translate_batch(self, texts, target, source='en'):
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(source=source, target=target)
+        return await asyncio.to_thread(translator.translate_batch, list(texts))
+
+
+class FakeBackend(TranslationBackend):
+    """Offline backend returning '[target] text', with an optional simulated round-trip delay."""
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def translate_batch(self, texts, target, source='en'):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [f"[{target}] {text}" for text in texts]
+
+
+class HttpBackend(TranslationBackend):
+    """POSTs {"texts", "source", "target"} as JSON and reads {"translations"} back."""
+
+    name = 'http'
+
+    def __init__(self, url=None, timeout=30):
+        self.url = url or os.environ.get('TRANSLATION_URL', DEFAULT_HTTP_URL)
+        self.timeout = timeout
+
+    async def translate_batch(self, texts, target, source='en'):
+        return await asyncio.to_thread(self._post, list(texts), target, source)
+
+    def _post(self, texts, target, source):
+        body = json.dumps({'texts': texts, 'source': source, 'target': target}).encode('utf-8')
+        request = urllib.request.Request(self.url, body, {'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                translations = json.load(response)['translations']
+        except urllib.error.HTTPError as e:
+            if e.code == 429 or e.code >= 500:
+                retry_after = e.headers.get('Retry-After')
+                raise RetryableError(f"HTTP {e.code}", float(retry_after) if retry_after else None) from None
+            raise
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise RetryableError(str(e)) from None
+        if len(translations) != len(texts):
+            raise RetryableError(f"{len(translations)} translations for {len(texts)} texts")
+        return translations
+
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'fake': FakeBackend,
+    'http': HttpBackend,
+}
+
+
+def get_backend(name):
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown translation backend: {name}") from None
+
+
+def locale_code(locale):
+    """Maps an Android resource qualifier (pt-rBR, b+es+419) to the language code MT services expect."""
+    if locale.startswith('b+'):
+        return locale.split('+')[1]
+    return locale.split('-r')[0]
+
+
+class TranslationMemory:
+    """Persistent (source text, target locale) -> translation store."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, text, locale):
+        return self.entries.get(locale, {}).get(text)
+
+    def put(self, text, locale, translation):
+        self.entries.setdefault(locale, {})[text] = translation
+        self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        write_file(self.path, json.dumps(self.entries, ensure_ascii=False, indent=1, sort_keys=True))
+        self.dirty = False
+
+
+async def _translate_chunk(backend, semaphore, texts, locale, memory, errors):
+    async with semaphore:
+        try:
+            translations = await backend.translate_batch(texts, locale_code(locale))
+        except Exception as e:
+            errors.append((locale, texts, e))
+            return
+    for text, translation in zip(texts, translations):
+        if translation:
+            memory.put(text, locale, translation)
+
+
+async def translate_missing(backend, missing_by_locale, memory, concurrency=8):
+    """
+    Translates {locale: {name: english}} into {locale: {name: translation}}.
+
+    Texts already in the memory are never sent again, identical texts within a
+    locale are sent once, and at most `concurrency` batches are in flight.
+    Strings that failed to translate are absent from the result; the errors are
+    returned alongside as (locale, texts, exception) tuples.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = []
+    tasks = []
+    for locale, missing in missing_by_locale.items():
+        pending = sorted({text for text in missing.values() if text and memory.get(text, locale) is None})
+        for start in range(0, len(pending), backend.max_batch):
+            chunk = pending[start:start + backend.max_batch]
+            tasks.append(_translate_chunk(backend, semaphore, chunk, locale, memory, errors))
+    await asyncio.gather(*tasks)
+
+    results = {}
+    for locale, missing in missing_by_locale.items():
+        results[locale] = {}
+        for name, text in missing.items():
+            translation = memory.get(text, locale) if text else text
+            if translation is not None:
+                results[locale][name] = translation
+    return results, errors
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Single-file JSONL interchange of translation work for every locale.
+
+Each line is one text to translate:
+
+    {"locale": "fr", "kind": "string", "key": "app_name", "source": "Contacts",
+     "source_hash": "8d7d9ad3d2b8e0c1", "target": ""}
+
+<plurals> rows also carry "quantity" (one row per CLDR category the locale
+needs) and <string-array> rows "index". source and target are raw strings.xml
+text, escapes and entities included; source_hash identifies the English text
+a target was written for, so import skips targets whose source has changed.
+
+    python translation_exchange.py export translations.jsonl        # every text missing from every locale
+    python translation_exchange.py export - fr de                   # to stdout, two locales
+    python translation_exchange.py export --suggest                 # with fuzzy-memory suggestions
+    python translation_exchange.py import translations.jsonl        # merge the rows that have a target
+    python translation_exchange.py convert translated_*.xml > pending.jsonl
+
+Export streams rows one at a time into a temp file that replaces the output
+once every row is written; exporting over an existing file keeps the targets
+already filled in, which are the only part of it held in memory. Import reads
+the file one row at a time and keeps just the targets it will apply until the
+locale files are written together. It only fills in entries and plural
+quantities a locale does not define yet, normalizing each target with
+normalize_escapes; existing translations are never overwritten.
+convert turns legacy per-locale <resources> dumps into rows for the strings
+their locale still lacks.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from content_cache import text_hash
+from merge_translations import merge_resources
+from normalize_escapes import normalize_value
+from plural_rules import for_locale, missing_quantities
+from resource_xml import ResourceFile
+from strings_catalog import StringsCatalog, parent_locales
+from translation_lock import TranslationLock, text_id
+from write_batch import AtomicWriter, WriteBatch
+
+EXCHANGE_FILE = 'translations.jsonl'
+
+
+def _row(locale, kind, key, source, target='', **position):
+    return {'locale': locale, 'kind': kind, 'key': key, **position,
+            'source': source, 'source_hash': text_hash(source), 'target': target}
+
+
+def _entry_rows(locale, kind, name, value, target=None):
+    """Yields the rows of one entry; plurals are spread over the locale's categories."""
+    if kind == 'plurals':
+        for quantity, source in value.items():
+            yield _row(locale, kind, name, source, (target or {}).get(quantity, ''), quantity=quantity)
+    elif kind == 'string-array':
+        for index, source in enumerate(value):
+            yield _row(locale, kind, name, source, target[index] if target and index < len(target) else '',
+                       index=index)
+    else:
+        yield _row(locale, kind, name, value, target or '')
+
+
+def export_rows(catalog, locales=None):
+    """
+    Yields a row for every base text a locale neither defines nor inherits, locale by locale.
+    An entry a variant lacks is left to its parent locale when that is exported too, so the
+    variant inherits the parent's translation instead of getting its own copy.
+    """
+    translatable = {(entry.kind, entry.name) for entry in ResourceFile.load(catalog.base_path).entries()
+                    if entry.translatable}
+    locales = locales or catalog.locales()
+    for locale in locales:
+        own = catalog.resources(locale)
+        resolved = catalog.resolved_resources(locale)
+        parent_exported = any(parent in locales for parent in parent_locales(locale))
+        for (kind, name), value in catalog.base_resources.items():
+            if (kind, name) not in translatable:
+                continue
+            if kind == 'plurals' and (kind, name) in own:
+                # Quantities the variant's own entry lacks are never inherited
+                lacking = missing_quantities(locale, own[(kind, name)])
+                wanted = for_locale(locale, value)
+                yield from _entry_rows(locale, kind, name, {quantity: wanted[quantity] for quantity in lacking})
+            elif (kind, name) not in resolved and not parent_exported:
+                yield from _entry_rows(locale, kind, name, for_locale(locale, value) if kind == 'plurals' else value)
+
+
+def row_id(row):
+    """Identifies the text a row translates: locale, kind, key, quantity/index and source hash."""
+    return (row['locale'], row['kind'], row['key'], row.get('quantity'), row.get('index'), row['source_hash'])
+
+
+def keep_targets(rows, previous):
+    """Fills in the targets of rows from previous ({row_id: target}) where the source is unchanged."""
+    for row in rows:
+        if not row['target']:
+            row['target'] = previous.get(row_id(row), '')
+        yield row
+
+
+def add_suggestions(rows, memory, limit=3):
+    """Adds the fuzzy-memory matches of each row's source, as "suggestions", for translators to pick from."""
+    for row in rows:
+        exclude = text_id(row['key'], row.get('quantity', row.get('index')))
+        suggestions = memory.suggest(row['locale'], row['source'], limit, exclude=exclude)
+        if suggestions:
+            row['suggestions'] = suggestions
+        yield row
+
+
+def write_rows(rows, out):
+    """Writes rows as JSON lines; returns how many were written."""
+    count = 0
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def export_file(rows, path):
+    """
+    Streams rows into path, carrying over the targets already filled in the file it replaces.
+    Returns how many rows were written; path is left untouched if exporting fails.
+    """
+    previous = {}
+    if os.path.exists(path):
+        previous = {row_id(row): row['target'] for row in read_rows(path) if row.get('target')}
+    with AtomicWriter(path) as out:
+        return write_rows(keep_targets(rows, previous), out)
+
+
+def read_rows(path):
+    """Yields the rows of a JSONL file one at a time ('-' reads stdin)."""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from None
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _current_source(base_resources, row):
+    value = base_resources.get((row['kind'], row['key']))
+    if value is None:
+        return None
+    if row['kind'] == 'plurals':
+        return value.get(row['quantity'], value.get('other'))
+    if row['kind'] == 'string-array':
+        return value[row['index']] if row['index'] < len(value) else None
+    return value
+
+
+def import_rows(rows, catalog, lock=None):
+    """
+    Merges the targets of rows into the locale files, recording their source hashes in lock if given.
+    Returns {'applied': n, 'existing': n, 'stale': [rows], 'empty': n}; incomplete
+    string-arrays count as empty, texts the locale file already defines as existing.
+    The locale files are written together in one batch, so the normalized targets of the
+    rows that have one (not the rows without a target) are held until then, together
+    with the stale rows for the report.
+    """
+    pending = {}
+    hashes = {}
+    stats = {'applied': 0, 'existing': 0, 'stale': [], 'empty': 0}
+    for row in rows:
+        if not row.get('target'):
+            stats['empty'] += 1
+            continue
+        source = _current_source(catalog.base_resources, row)
+        if source is None or text_hash(source) != row['source_hash']:
+            stats['stale'].append(row)
+            continue
+        target = normalize_value(row['target'])
+        hashes[(row['locale'], text_id(row['key'], row.get('quantity', row.get('index'))))] = row['source_hash']
+        entries = pending.setdefault(row['locale'], {})
+        key = (row['kind'], row['key'])
+        if row['kind'] == 'plurals':
+            entries.setdefault(key, {})[row['quantity']] = target
+        elif row['kind'] == 'string-array':
+            entries.setdefault(key, {})[row['index']] = target
+        else:
+            entries[key] = target
+
+    batch = WriteBatch()
+    merged = []
+    for locale, entries in pending.items():
+        own = catalog.resources(locale) if locale in catalog.paths else {}
+        for (kind, name), value in list(entries.items()):
+            defined = own.get((kind, name))
+            if kind == 'plurals' and defined is not None:
+                for quantity in set(value) & set(defined):
+                    stats['existing'] += 1
+                    del value[quantity]
+                if not value:
+                    del entries[(kind, name)]
+            elif defined is not None:
+                stats['existing'] += len(value) if kind == 'string-array' else 1
+                del entries[(kind, name)]
+            elif kind == 'string-array':
+                size = len(catalog.base_resources[(kind, name)])
+                if sorted(value) != list(range(size)):
+                    stats['empty'] += len(value)
+                    del entries[(kind, name)]
+                    continue
+                entries[(kind, name)] = [value[index] for index in range(size)]
+        if not entries:
+            continue
+        path = catalog.paths.get(locale) or os.path.join(catalog.res_path, f'values-{locale}', 'strings.xml')
+        merge_resources(path, entries, path, order=catalog.base_resources, batch=batch)
+        merged.append((locale, path))
+        if lock is not None:
+            for (kind, name), value in entries.items():
+                positions = value if kind == 'plurals' else range(len(value)) if kind == 'string-array' else [None]
+                for position in positions:
+                    text = text_id(name, position)
+                    lock.record_hash(locale, text, hashes[(locale, text)])
+        stats['applied'] += sum(len(value) if isinstance(value, (dict, list)) else 1 for value in entries.values())
+
+    batch.commit()
+    for locale, path in merged:
+        catalog.paths.setdefault(locale, path)
+        catalog.reload(locale)
+    return stats
+
+
+def convert_rows(catalog, dump_paths):
+    """Yields rows for the strings of legacy translated_<locale>.xml dumps that their locale still lacks."""
+    for path in dump_paths:
+        locale = os.path.basename(path)[:-len('.xml')].split('_', 1)[1]
+        resolved = catalog.resolved_resources(locale) if locale in catalog.paths else {}
+        for (kind, name), target in ResourceFile.load(path).resources().items():
+            value = catalog.base_resources.get((kind, name))
+            if value is None or (kind, name) in resolved:
+                continue
+            if kind == 'plurals':
+                value = {quantity: value.get(quantity, value.get('other')) for quantity in target}
+            yield from _entry_rows(locale, kind, name, value, target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and import translation work as a single JSONL file")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help='write a row for every missing text')
+    export_parser.add_argument('output', nargs='?', default=EXCHANGE_FILE, help="JSONL file, or '-' for stdout")
+    export_parser.add_argument('locales', nargs='*', help='locales to export (default: all)')
+    export_parser.add_argument('--suggest', action='store_true', help='add similar existing translations to each row')
+    import_parser = commands.add_parser('import', help='merge the translated rows into the locale files')
+    import_parser.add_argument('input', nargs='?', default=EXCHANGE_FILE, help="JSONL file, or '-' for stdin")
+    convert_parser = commands.add_parser('convert', help='turn translated_<locale>.xml dumps into rows on stdout')
+    convert_parser.add_argument('dumps', nargs='+')
+    args = parser.parse_args()
+
+    catalog = StringsCatalog()
+    if args.command == 'export':
+        rows = export_rows(catalog, args.locales)
+        if args.suggest:
+            from fuzzy_memory import FuzzyMemory
+            rows = add_suggestions(rows, FuzzyMemory(catalog))
+        if args.output == '-':
+            count = write_rows(rows, sys.stdout)
+        else:
+            count = export_file(rows, args.output)
+        print(f"Exported {count} rows", file=sys.stderr)
+    elif args.command == 'import':
+        lock = TranslationLock()
+        stats = import_rows(read_rows(args.input), catalog, lock)
+        lock.save()
+        for row in stats['stale']:
+            print(f"  [STALE] {row['locale']}: {row['key']} (source text changed since export)", file=sys.stderr)
+        print(f"Imported {stats['applied']} texts, {stats['existing']} already translated, "
+              f"{len(stats['stale'])} stale, {stats['empty']} untranslated", file=sys.stderr)
+    else:
+        count = write_rows(convert_rows(catalog, args.dumps), sys.stdout)
+        print(f"Converted {count} rows", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
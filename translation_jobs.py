@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Resumable machine translation of every text the locales are missing.
+
+Each text a locale lacks (one row of translation_exchange.export_rows) is a
+unit of work. Finished units are appended to a journal as soon as their batch
+returns, and merged into the locale files in periodic flushes, so a run that
+is interrupted or killed resumes where it stopped: journaled units are
+flushed, never translated again. Requests pass through a token bucket, and
+throttled or failed requests are retried with exponential backoff, honouring
+Retry-After. A unit that keeps failing is left missing rather than filled
+with English. Texts whose English is identical to an already translated
+string (or, with --reuse-threshold, close to it) take that translation from
+fuzzy_memory instead of going to MT.
+
+    python translation_jobs.py --backend http --rate 5
+    python translation_jobs.py fr de --backend fake
+
+    python translation_stub_server.py --throttle 0.2 --error 0.1 --rate 20 &
+    python translation_jobs.py --backend http --url http://127.0.0.1:8765/translate
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from fuzzy_memory import DEFAULT_THRESHOLD, FuzzyMemory, fill
+from placeholder_mask import PlaceholderError, mask, unmask
+from resource_xml import escape_text
+from strings_catalog import StringsCatalog
+from translation_backend import BACKENDS, FakeBackend, HttpBackend, RetryableError, get_backend, locale_code
+from translation_exchange import export_rows, import_rows, row_id
+from translation_lock import TranslationLock
+
+JOURNAL_FILE = '.translation_jobs.journal'
+
+
+class TokenBucket:
+    """Lets `rate` requests per second through on average, in bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def pause(self, seconds):
+        """Holds every caller back for at least `seconds`, e.g. after the server asked to retry later."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class Journal:
+    """Append-only JSONL file of finished units, synced to disk after every batch."""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+
+    def load(self):
+        """Returns the journaled rows; a line cut short by a crash is ignored."""
+        rows = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def append(self, rows):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JobRunner:
+    """Translates units in batches under a rate limit, journaling and flushing as it goes."""
+
+    def __init__(self, catalog, backend, journal, bucket, lock=None, batch_size=None, concurrency=4,
+                 flush_every=500, flush_interval=30.0, max_attempts=6, base_delay=0.5, max_delay=30.0,
+                 memory=None, reuse_threshold=DEFAULT_THRESHOLD):
+        self.catalog = catalog
+        self.backend = backend
+        self.journal = journal
+        self.bucket = bucket
+        self.lock = lock
+        self.batch_size = batch_size or backend.max_batch
+        self.concurrency = concurrency
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.memory = memory
+        self.reuse_threshold = reuse_threshold
+        self.random = random.Random()
+        self.unflushed = []
+        self.last_flush = time.monotonic()
+        self.stats = {'resumed': 0, 'reused': 0, 'translated': 0, 'failed': 0, 'retries': 0, 'flushes': 0}
+
+    def flush(self):
+        """Merges the finished, not yet flushed units into the locale files."""
+        if not self.unflushed:
+            return
+        import_rows(self.unflushed, self.catalog, self.lock)
+        if self.lock is not None:
+            self.lock.save()
+        self.unflushed = []
+        self.last_flush = time.monotonic()
+        self.stats['flushes'] += 1
+
+    async def _request(self, texts, locale):
+        for attempt in range(self.max_attempts):
+            await self.bucket.acquire()
+            try:
+                return await self.backend.translate_batch(texts, locale_code(locale))
+            except RetryableError as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                self.stats['retries'] += 1
+                delay = min(self.max_delay, self.base_delay * 2 ** attempt) * (0.5 + self.random.random() / 2)
+                if e.retry_after:
+                    self.bucket.pause(e.retry_after)
+                    delay = max(delay, e.retry_after)
+                await asyncio.sleep(delay)
+
+    async def _run_batch(self, semaphore, locale, rows):
+        async with semaphore:
+            masked = [mask(row['source']) for row in rows]
+            try:
+                translations = await self._request([text for text, _ in masked], locale)
+            except Exception as e:
+                print(f"  [ERROR] {locale}: {len(rows)} texts not translated: {e}", file=sys.stderr)
+                self.stats['failed'] += len(rows)
+                return
+
+        done = []
+        for row, (_, tokens), translation in zip(rows, masked, translations):
+            try:
+                row['target'] = unmask(escape_text(translation), tokens)
+            except PlaceholderError as e:
+                print(f"  [ERROR] {locale}: {row['key']}: {e}", file=sys.stderr)
+                self.stats['failed'] += 1
+                continue
+            done.append(row)
+        self.journal.append(done)
+        self.unflushed.extend(done)
+        self.stats['translated'] += len(done)
+        if len(self.unflushed) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    async def run(self, rows):
+        """Translates the rows not already journaled, then flushes and drops the journal."""
+        finished = self.journal.load()
+        self.stats['resumed'] = len(finished)
+        self.unflushed.extend(finished)
+        self.flush()
+
+        done_ids = {row_id(row) for row in finished}
+        rows = [row for row in rows if row['source'] and row_id(row) not in done_ids]
+        if self.memory is not None:
+            reused = list(fill(self.memory, rows, self.reuse_threshold))
+            self.journal.append(reused)
+            self.unflushed.extend(reused)
+            self.stats['reused'] = len(reused)
+
+        by_locale = {}
+        for row in rows:
+            if not row['target']:
+                by_locale.setdefault(row['locale'], []).append(row)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [self._run_batch(semaphore, locale, locale_rows[start:start + self.batch_size])
+                 for locale, locale_rows in by_locale.items()
+                 for start in range(0, len(locale_rows), self.batch_size)]
+        await asyncio.gather(*tasks)
+
+        self.flush()
+        self.journal.remove()
+        return self.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Machine-translate every missing text, resumably and rate-limited")
+    parser.add_argument('locales', nargs='*', help='locales to fill (default: all)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='http')
+    parser.add_argument('--url', help='translation endpoint for --backend http')
+    parser.add_argument('--rate', type=float, default=5.0, help='requests per second')
+    parser.add_argument('--burst', type=float, help='requests allowed at once (default: one second worth)')
+    parser.add_argument('--batch-size', type=int, help='texts per request (default: the backend maximum)')
+    parser.add_argument('--concurrency', type=int, default=4, help='requests in flight')
+    parser.add_argument('--flush-every', type=int, default=500, help='texts between writes to the locale files')
+    parser.add_argument('--flush-interval', type=float, default=30.0, help='seconds between writes at most')
+    parser.add_argument('--max-attempts', type=int, default=6, help='tries per request before giving up')
+    parser.add_argument('--journal', default=JOURNAL_FILE, help='checkpoint journal')
+    parser.add_argument('--reuse-threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='similarity at which an existing translation is reused instead of MT')
+    parser.add_argument('--no-reuse', action='store_true', help='send every text to MT')
+    parser.add_argument('--fake-latency', type=float, default=0.0, help='simulated seconds per batch for --backend fake')
+    args = parser.parse_args()
+
+    if args.backend == 'fake':
+        backend = FakeBackend(args.fake_latency)
+    elif args.backend == 'http':
+        backend = HttpBackend(args.url)
+    else:
+        backend = get_backend(args.backend)
+
+    catalog = StringsCatalog()
+    rows = list(export_rows(catalog, args.locales))
+    runner = JobRunner(catalog, backend, Journal(args.journal), TokenBucket(args.rate, args.burst),
+                       TranslationLock(), args.batch_size, args.concurrency, args.flush_every,
+                       args.flush_interval, args.max_attempts,
+                       memory=None if args.no_reuse else FuzzyMemory(catalog), reuse_threshold=args.reuse_threshold)
+    try:
+        stats = asyncio.run(runner.run(rows))
+    except KeyboardInterrupt:
+        runner.flush()
+        print(f"Interrupted after {runner.stats['translated']} texts; run again to resume", file=sys.stderr)
+        sys.exit(130)
+
+    print(f"{stats['translated']} texts translated, {stats['reused']} reused, {stats['resumed']} resumed from the journal, "
+          f"{stats['failed']} failed, {stats['retries']} retries, {stats['flushes']} flushes")
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
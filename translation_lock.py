@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tracks which English text every translation was made from, to find stale ones.
+
+translations.lock.json records, per locale and per text (a string, one plural
+quantity or one array item), the hash of the base text it was translated
+from. When the English text of a key changes, its translations keep the old
+hash and are listed as stale; nothing else is.
+
+    python translation_lock.py                     # list stale (key, locale) pairs
+    python translation_lock.py fr de               # only these locales
+    python translation_lock.py --update fr         # accept the current fr texts as up to date
+    python translation_lock.py --translate --backend fake   # retranslate the stale texts
+
+Texts that are not in the lock yet are counted as untracked, not stale; run
+--update once to start tracking a locale's current translations. Importing
+rows with translation_exchange.py and machine-translating with
+translate_strings.py record the texts they add.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+from content_cache import text_hash
+from placeholder_mask import PlaceholderError, mask, unmask
+from resource_xml import ResourceFile, escape_text
+from strings_catalog import StringsCatalog
+from translation_backend import BACKENDS, FakeBackend, TranslationMemory, get_backend, translate_missing
+from write_batch import WriteBatch, write_file
+
+LOCK_FILE = 'translations.lock.json'
+
+
+def text_id(name, position=None):
+    """Names one text of an entry: 'name', 'name[one]' for a plural quantity, 'name[0]' for an array item."""
+    return name if position is None else f'{name}[{position}]'
+
+
+def locale_texts(resources):
+    """Yields (text_id, kind, name, position, Value) for every text of a ResourceFile."""
+    for entry in resources.entries():
+        for index, value in enumerate(entry.values):
+            if entry.kind == 'plurals':
+                position = value.quantity
+            elif entry.kind == 'string-array':
+                position = index
+            else:
+                position = None
+            yield text_id(entry.name, position), entry.kind, entry.name, position, value
+
+
+def base_source(base_resources, kind, name, position):
+    """Returns the English text a locale text translates (a plural category the base lacks uses 'other')."""
+    value = base_resources.get((kind, name))
+    if value is None:
+        return None
+    if kind == 'plurals':
+        return value.get(position, value.get('other'))
+    if kind == 'string-array':
+        return value[position] if position < len(value) else None
+    return value
+
+
+class TranslationLock:
+    """Persistent {locale: {text_id: source hash}} of the base texts translations were made from."""
+
+    def __init__(self, path=LOCK_FILE):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('locales', {})
+
+    def get(self, locale, text):
+        return self.entries.get(locale, {}).get(text)
+
+    def record(self, locale, text, source):
+        """Records that a locale's text was translated from the English source."""
+        self.record_hash(locale, text, text_hash(source))
+
+    def record_hash(self, locale, text, source_hash):
+        if self.entries.get(locale, {}).get(text) != source_hash:
+            self.entries.setdefault(locale, {})[text] = source_hash
+            self.dirty = True
+
+    def forget(self, locale, keep):
+        """Drops the hashes of a locale's texts that are not in keep."""
+        hashes = self.entries.get(locale, {})
+        for text in [text for text in hashes if text not in keep]:
+            del hashes[text]
+            self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        write_file(self.path, json.dumps({'version': 1, 'locales': self.entries},
+                                         ensure_ascii=False, indent=1, sort_keys=True) + '\n')
+        self.dirty = False
+
+
+def check(catalog, lock, locales=None):
+    """
+    Compares every translated text with the hash it was recorded with.
+    Returns (stale, untracked): stale is a list of (locale, text_id, kind, name,
+    position, current source); untracked counts the texts per locale with no hash.
+    """
+    stale = []
+    untracked = {}
+    for locale in locales or catalog.locales():
+        resources = ResourceFile.load(catalog.paths[locale])
+        for text, kind, name, position, _ in locale_texts(resources):
+            source = base_source(catalog.base_resources, kind, name, position)
+            if source is None:
+                continue
+            recorded = lock.get(locale, text)
+            if recorded is None:
+                untracked[locale] = untracked.get(locale, 0) + 1
+            elif recorded != text_hash(source):
+                stale.append((locale, text, kind, name, position, source))
+    return stale, untracked
+
+
+def update(catalog, lock, locales=None):
+    """Records the current base text of every text the locales define; returns how many changed."""
+    changed = 0
+    for locale in locales or catalog.locales():
+        resources = ResourceFile.load(catalog.paths[locale])
+        seen = set()
+        for text, kind, name, position, _ in locale_texts(resources):
+            source = base_source(catalog.base_resources, kind, name, position)
+            if source is None:
+                continue
+            seen.add(text)
+            if lock.get(locale, text) != text_hash(source):
+                lock.record(locale, text, source)
+                changed += 1
+        lock.forget(locale, seen)
+    return changed
+
+
+def retranslate(catalog, lock, stale, backend, memory, concurrency=8):
+    """Machine-translates the stale texts again, replaces them in place and records the new source hashes."""
+    by_locale = {}
+    tokens = {}
+    for locale, text, _, _, _, source in stale:
+        by_locale.setdefault(locale, {})[text], tokens[source] = mask(source)
+
+    translations, errors = asyncio.run(translate_missing(backend, by_locale, memory, concurrency))
+    for locale, texts, e in errors:
+        print(f"Error translating {len(texts)} strings to {locale}: {e}")
+
+    sources = {(locale, text): source for locale, text, _, _, _, source in stale}
+    updated = 0
+    batch = WriteBatch()
+    for locale, texts in translations.items():
+        resources = ResourceFile.load(catalog.paths[locale])
+        for text, _, _, _, value in locale_texts(resources):
+            if text not in texts:
+                continue
+            source = sources[(locale, text)]
+            try:
+                raw = unmask(escape_text(texts[text]), tokens[source])
+            except PlaceholderError as e:
+                print(f"Placeholders lost translating '{text}' to {locale}: {e}")
+                continue
+            resources.set_value(value, raw)
+            lock.record(locale, text, source)
+            updated += 1
+        resources.save(batch=batch)
+    batch.commit()
+    for locale in translations:
+        catalog.reload(locale)
+    memory.save()
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List translations whose English source changed since they were made")
+    parser.add_argument('locales', nargs='*', help='locales to check (default: all)')
+    parser.add_argument('--lock', default=LOCK_FILE, help='lock file')
+    parser.add_argument('--update', action='store_true', help='record the current texts as up to date')
+    parser.add_argument('--translate', action='store_true', help='machine-translate the stale texts again')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='google')
+    parser.add_argument('--concurrency', type=int, default=8, help='maximum batches in flight')
+    parser.add_argument('--memory', default='translation_memory.json', help='translation memory file')
+    parser.add_argument('--fake-latency', type=float, default=0.0, help='simulated seconds per batch for --backend fake')
+    args = parser.parse_args()
+
+    catalog = StringsCatalog()
+    lock = TranslationLock(args.lock)
+
+    if args.update:
+        changed = update(catalog, lock, args.locales)
+        lock.save()
+        print(f"Recorded {changed} source hashes")
+        return
+
+    stale, untracked = check(catalog, lock, args.locales)
+    for locale, text, _, _, _, source in stale:
+        print(f"{locale}: {text} (source is now \"{source}\")")
+    print(f"{len(stale)} stale translations, {sum(untracked.values())} untracked texts in {len(untracked)} locales")
+
+    if args.translate and stale:
+        backend = FakeBackend(args.fake_latency) if args.backend == 'fake' else get_backend(args.backend)
+        updated = retranslate(catalog, lock, stale, backend, TranslationMemory(args.memory), args.concurrency)
+        lock.save()
+        print(f"Retranslated {updated} texts")
+    elif stale:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
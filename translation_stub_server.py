@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a machine-translation service, to exercise the translation
+job runner offline against throttling and server errors.
+
+    POST /translate {"texts": [...], "target": "fr"}  ->  {"translations": ["[fr] ...", ...]}
+
+    python translation_stub_server.py --throttle 0.1 --error 0.05 --rate 20
+
+--throttle and --error answer that fraction of requests with 429 (with a
+Retry-After header) and 500; --rate answers 429 to requests beyond that many
+per second. --seed makes the injected failures reproducible.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            texts = request['texts']
+            target = request['target']
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {'error': 'expected {"texts": [...], "target": "..."}'})
+            return
+
+        status = server.decide()
+        if status == 429:
+            self._reply(429, {'error': 'rate limited'}, {'Retry-After': f'{server.retry_after:g}'})
+        elif status == 500:
+            self._reply(500, {'error': 'injected failure'})
+        else:
+            self._reply(200, {'translations': [f'[{target}] {text}' for text in texts]})
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, throttle=0.0, error=0.0, rate=None, retry_after=0.5, seed=None, verbose=False):
+        super().__init__(address, StubHandler)
+        self.throttle = throttle
+        self.error = error
+        self.rate = rate
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.window = []
+        self.counts = {200: 0, 429: 0, 500: 0}
+
+    def decide(self):
+        """Returns the status of the next request: 429 when over --rate or throttled, 500, or 200."""
+        with self.lock:
+            now = time.monotonic()
+            self.window = [t for t in self.window if now - t < 1.0]
+            roll = self.random.random()
+            if self.rate is not None and len(self.window) >= self.rate:
+                status = 429
+            elif roll < self.throttle:
+                status = 429
+            elif roll < self.throttle + self.error:
+                status = 500
+            else:
+                status = 200
+                self.window.append(now)
+            self.counts[status] += 1
+            return status
+
+
+def start(port=0, **options):
+    """Starts a stub server in a background thread; returns it (its URL is server.url)."""
+    server = StubServer(('127.0.0.1', port), **options)
+    server.url = f'http://127.0.0.1:{server.server_address[1]}/translate'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake translation API that injects throttling and errors")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--throttle', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--error', type=float, default=0.0, help='fraction of requests answered 500')
+    parser.add_argument('--rate', type=float, help='requests per second above which the server answers 429')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After seconds sent with a 429')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    server = StubServer(('127.0.0.1', args.port), args.throttle, args.error, args.rate, args.retry_after,
+                        args.seed, args.verbose)
+    print(f"Serving on http://127.0.0.1:{args.port}/translate", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"Answered {server.counts[200]} ok, {server.counts[429]} throttled, {server.counts[500]} errors",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
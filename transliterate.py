@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Table-driven script transliteration for strings.xml files.
+
+Each mapping in SCRIPT_MAPPINGS is compiled once into a str.translate table.
+Format specifiers, entities, escapes and inline markup are left untouched;
+everything between them is converted in one str.translate call.
+
+DERIVATIONS lists the script-variant locales generated from a source locale:
+
+    python transliterate.py                       # regenerate every derived locale
+    python transliterate.py --target b+ff+Adlm    # only this one
+    python transliterate.py --mapping Latn-Adlm --source b+ff+Latn --target b+fuf+Adlm
+"""
+
+import argparse
+import os
+
+from placeholder_mask import PROTECTED_RE
+from resource_xml import ResourceFile
+from strings_catalog import RES_PATH
+from write_batch import WriteBatch
+
+# Latin Fulfulde/Pulaar to Adlam
+LATIN_TO_ADLAM = {
+    'a': '𞤢', 'A': '𞤀',
+    'b': '𞤦', 'B': '𞤄',
+    'ɓ': '𞤩', 'Ɓ': '𞤇',
+    'c': '𞤷', 'C': '𞤕',
+    'd': '𞤣', 'D': '𞤁',
+    'ɗ': '𞤯', 'Ɗ': '𞤍',
+    'e': '𞤫', 'E': '𞤉',
+    'f': '𞤬', 'F': '𞤊',
+    'g': '𞤺', 'G': '𞤘',
+    'h': '𞤸', 'H': '𞤖',
+    'i': '𞤭', 'I': '𞤋',
+    'j': '𞤶', 'J': '𞤔',
+    'k': '𞤳', 'K': '𞤑',
+    'l': '𞤤', 'L': '𞤂',
+    'm': '𞤥', 'M': '𞤃',
+    'n': '𞤲', 'N': '𞤐',
+    'ŋ': '𞤻', 'Ŋ': '𞤙',
+    'ñ': '𞤻', 'Ñ': '𞤙',
+    'o': '𞤮', 'O': '𞤌',
+    'p': '𞤨', 'P': '𞤆',
+    'r': '𞤪', 'R': '𞤈',
+    's': '𞤧', 'S': '𞤅',
+    't': '𞤼', 'T': '𞤚',
+    'u': '𞤵', 'U': '𞤓',
+    'w': '𞤱', 'W': '𞤏',
+    'y': '𞤴', 'Y': '𞤒',
+    'ƴ': '𞤴', 'Ƴ': '𞤒',
+    'z': '𞥀', 'Z': '𞤞',
+    # Digits
+    '0': '𞥐', '1': '𞥑', '2': '𞥒', '3': '𞥓', '4': '𞥔',
+    '5': '𞥕', '6': '𞥖', '7': '𞥗', '8': '𞥘', '9': '𞥙',
+}
+
+SCRIPT_MAPPINGS = {
+    'identity': {},
+    'Latn-Adlm': LATIN_TO_ADLAM,
+}
+
+# (source locale, mapping, derived locale)
+DERIVATIONS = [
+    ('b+ff+Latn', 'Latn-Adlm', 'b+ff+Adlm'),
+    ('b+ff+Latn', 'identity', 'b+fuf+Latn'),
+    ('b+ff+Latn', 'Latn-Adlm', 'b+fuf+Adlm'),
+]
+
+_tables = {}
+
+
+def register_mapping(name, mapping):
+    """Adds a character mapping (single characters to strings) under a name."""
+    SCRIPT_MAPPINGS[name] = mapping
+    _tables.pop(name, None)
+
+
+def get_table(name):
+    """Returns the compiled str.translate table of a registered mapping."""
+    table = _tables.get(name)
+    if table is None:
+        table = _tables[name] = str.maketrans(SCRIPT_MAPPINGS[name])
+    return table
+
+
+def transliterate(text, mapping):
+    """Converts text with a registered mapping, leaving protected spans as they are."""
+    table = get_table(mapping)
+    if not table:
+        return text
+    parts = []
+    pos = 0
+    for match in PROTECTED_RE.finditer(text):
+        parts.append(text[pos:match.start()].translate(table))
+        parts.append(match.group(0))
+        pos = match.end()
+    if not pos:
+        return text.translate(table)
+    parts.append(text[pos:].translate(table))
+    return ''.join(parts)
+
+
+def transliterate_file(resources, mapping):
+    """Converts every string, plurals and string-array value of a loaded ResourceFile in place."""
+    for entry in resources.entries():
+        for value in entry.values:
+            resources.set_value(value, transliterate(value.raw, mapping))
+    return resources
+
+
+def locale_path(locale, res_path=RES_PATH):
+    return os.path.join(res_path, f'values-{locale}', 'strings.xml')
+
+
+def derive(derivations, res_path=RES_PATH):
+    """
+    Writes every derived locale in one batch, after all of them converted; each source file
+    is read once. Returns the paths whose content changed.
+    """
+    sources = {}
+    batch = WriteBatch()
+    for source, mapping, target in derivations:
+        if source not in sources:
+            with open(locale_path(source, res_path), 'r', encoding='utf-8', newline='') as f:
+                sources[source] = f.read()
+        resources = transliterate_file(ResourceFile(sources[source]), mapping)
+        resources.save(locale_path(target, res_path), batch)
+    return batch.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive script-variant locales by transliteration")
+    parser.add_argument('--mapping', choices=sorted(SCRIPT_MAPPINGS), help='mapping for an ad-hoc derivation')
+    parser.add_argument('--source', help='source locale for an ad-hoc derivation')
+    parser.add_argument('--target', action='append', help='derived locale to (re)generate (repeatable)')
+    parser.add_argument('--res', default=RES_PATH, help='res directory')
+    args = parser.parse_args()
+
+    if args.mapping or args.source:
+        if not (args.mapping and args.source and args.target):
+            parser.error('--mapping and --source need at least one --target')
+        derivations = [(args.source, args.mapping, target) for target in args.target]
+    else:
+        derivations = [d for d in DERIVATIONS if not args.target or d[2] in args.target]
+
+    for path in derive(derivations, args.res):
+        print(f"Wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,24 +1,17 @@
 
-import xml.etree.ElementTree as ET
 import sys
 
+from plural_rules import for_locale, missing_quantities
+from resource_xml import format_entry, map_value
+from strings_catalog import get_locale_from_path, parse_resources, parse_strings
+
 def get_strings_from_file(file_path):
     """Parses an XML file and returns a set of string names."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        return {elem.attrib['name'] for elem in root.findall('string')}
-    except (ET.ParseError, FileNotFoundError):
-        return set()
+    return set(parse_strings(file_path))
 
 def get_full_strings_from_file(file_path):
     """Parses an XML file and returns a dictionary of string name -> value."""
-    try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        return {elem.attrib['name']: elem.text for elem in root.findall('string')}
-    except (ET.ParseError, FileNotFoundError):
-        return {}
+    return parse_strings(file_path)
 
 def main():
     if len(sys.argv) != 3:
@@ -27,19 +20,27 @@ def main():
 
     base_strings_path = sys.argv[1]
     locale_strings_path = sys.argv[2]
+    locale = get_locale_from_path(locale_strings_path)
 
-    base_strings_map = get_full_strings_from_file(base_strings_path)
-    locale_strings_set = get_strings_from_file(locale_strings_path)
+    base_resources = parse_resources(base_strings_path)
+    locale_resources = parse_resources(locale_strings_path)
 
-    missing_strings = {name: value for name, value in base_strings_map.items() if name not in locale_strings_set}
+    missing = {key: value for key, value in base_resources.items() if key not in locale_resources}
+    incomplete = {name: missing_quantities(locale, locale_resources[(kind, name)])
+                  for kind, name in base_resources if kind == 'plurals' and (kind, name) in locale_resources}
+    incomplete = {name: quantities for name, quantities in incomplete.items() if quantities}
 
-    if not missing_strings:
+    if not missing and not incomplete:
         return
 
     print("<!-- Missing translations -->")
-    for name, value in missing_strings.items():
-        translated_value = f"NEEDS TRANSLATION: {value}"
-        print(f'    <string name="{name}">{translated_value}</string>')
+    for (kind, name), value in missing.items():
+        if kind == 'plurals':
+            # The locale needs its own CLDR categories, not the base file's one/other
+            value = for_locale(locale, value)
+        sys.stdout.write(format_entry(kind, name, map_value(value, lambda raw: f"NEEDS TRANSLATION: {raw}")))
+    for name, quantities in incomplete.items():
+        print(f"    <!-- plurals {name}: missing quantities {', '.join(quantities)} -->")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Offline check of the string-resource rules aapt2 enforces, so escaping
+mistakes fail here in well under a second instead of in a Gradle build.
+
+For every values*/strings.xml, in parallel:
+  - the file must be well-formed XML
+  - resource names must be unique per file, and plural quantities per entry
+  - plural quantities must be CLDR categories (zero, one, two, few, many, other)
+  - apostrophes must be escaped or inside a double-quoted string
+  - backslash escapes must be valid, \\u followed by four hex digits
+  - several substitutions must be positional unless formatted="false"
+  - a translated string may only use format arguments the base string passes,
+    with the same conversion (leaving one out is fine, e.g. a plural suffix)
+
+    python validate_resources.py
+    python validate_resources.py values-fr values-de
+
+Diagnostics are printed as path:line:column: message; the exit status is 1
+if there are any.
+"""
+
+import argparse
+import re
+import sys
+import xml.parsers.expat
+
+from lint_resources import check_apostrophes, check_backslashes, decode_refs, mask_markup
+from locale_batch import add_jobs_argument, filter_dirs, locale_string_files, report_errors, run_locales
+from placeholder_mask import format_specifiers
+from resource_xml import ResourceFile, ResourceFormatError
+from strings_catalog import BASE_STRINGS_FILE
+
+PLURAL_QUANTITIES = {'zero', 'one', 'two', 'few', 'many', 'other'}
+SPECIFIER_RE = re.compile(r'%(?:(\d+)\$)?[-#+0,(]*\d*(?:\.\d+)?([a-zA-Z])')
+
+
+class Diagnostic:
+    __slots__ = ('path', 'line', 'column', 'message')
+
+    def __init__(self, path, line, column, message):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.message = message
+
+    def __str__(self):
+        return f"{self.path}:{self.line}:{self.column}: error: {self.message}"
+
+
+def format_signature(raw):
+    """Returns the format arguments of a value as {position: conversion}."""
+    signature = {}
+    next_position = 1
+    for specifier in format_specifiers(raw):
+        match = SPECIFIER_RE.match(specifier)
+        if not match:
+            continue
+        position, conversion = match.groups()
+        if position:
+            signature[int(position)] = conversion
+        else:
+            signature[next_position] = conversion
+            next_position += 1
+    return signature
+
+
+def _check_xml(path, text):
+    parser = xml.parsers.expat.ParserCreate()
+    try:
+        parser.Parse(text.encode('utf-8'), True)
+    except xml.parsers.expat.ExpatError as e:
+        return [Diagnostic(path, e.lineno, e.offset + 1, f"XML: {xml.parsers.expat.ErrorString(e.code)}")]
+    return []
+
+
+def validate_file(locale, path, base_signatures):
+    """Returns the diagnostics of one strings.xml as formatted strings."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        text = f.read()
+    diagnostics = _check_xml(path, text)
+    if diagnostics:
+        return [str(d) for d in diagnostics]
+
+    try:
+        resources = ResourceFile(text, path)
+        entries = resources.entries()
+    except ResourceFormatError as e:
+        return [str(Diagnostic(path, 1, 1, str(e)))]
+
+    def at(offset, message):
+        line = resources.line_of(offset)
+        column = offset - text.rfind('\n', 0, offset)
+        diagnostics.append(Diagnostic(path, line, column, message))
+
+    seen = {}
+    for entry in entries:
+        key = (entry.kind, entry.name)
+        if not entry.name:
+            at(entry.start, f"<{entry.kind}> without a name")
+        elif key in seen:
+            at(entry.start, f"duplicate {entry.kind} '{entry.name}' (first defined on line {seen[key]})")
+        else:
+            seen[key] = resources.line_of(entry.start)
+
+        if entry.kind == 'plurals':
+            quantities = set()
+            for value in entry.values:
+                if value.quantity not in PLURAL_QUANTITIES:
+                    at(value.start, f"plurals '{entry.name}' has invalid quantity '{value.quantity}'")
+                elif value.quantity in quantities:
+                    at(value.start, f"plurals '{entry.name}' defines quantity '{value.quantity}' twice")
+                quantities.add(value.quantity)
+
+        formatted = entry.attrs.get('formatted') != 'false'
+        for value in entry.values:
+            label = entry.name if value.quantity is None else f"{entry.name}[{value.quantity}]"
+            decoded, offsets = decode_refs(mask_markup(value.raw))
+            for check in (check_apostrophes, check_backslashes):
+                for offset, message in check(decoded):
+                    raw_offset = offsets[offset] if offsets and offset < len(offsets) else offset
+                    at(value.start + raw_offset, f"'{label}': {message}")
+
+            if formatted and '%' in value.raw:
+                specifiers = format_specifiers(value.raw)
+                if len(specifiers) > 1 and any('$' not in specifier for specifier in specifiers):
+                    at(value.start, f"'{label}': multiple substitutions specified in non-positional format")
+
+        if locale and entry.kind == 'string' and formatted and entry.name in base_signatures:
+            expected = base_signatures[entry.name]
+            for position, conversion in sorted(format_signature(entry.raw).items()):
+                if expected.get(position) != conversion:
+                    passed = f"%{position}${expected[position]}" if position in expected else 'nothing'
+                    at(entry.start, f"'{entry.name}': uses %{position}${conversion} but the base passes {passed} there")
+
+    return [str(d) for d in diagnostics]
+
+
+def base_format_signatures(base_path=BASE_STRINGS_FILE):
+    """Returns {name: signature} for the base strings, used to check every translation against."""
+    try:
+        resources = ResourceFile.load(base_path)
+        return {entry.name: format_signature(entry.raw) for entry in resources.entries() if entry.kind == 'string'}
+    except (FileNotFoundError, ResourceFormatError):
+        return {}
+
+
+def validate(locale_paths, jobs=1):
+    """Validates the given (locale, path) pairs; returns (diagnostic lines, per-file results)."""
+    results = run_locales(validate_file, locale_paths, jobs, base_format_signatures())
+    return [line for result in results if result.ok for line in result.value], results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check strings.xml files against the rules aapt2 enforces")
+    parser.add_argument('dirs', nargs='*', help='values* directories to check (default: all)')
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
+    locale_paths = filter_dirs(locale_string_files(include_base=True), args.dirs)
+
+    diagnostics, results = validate(locale_paths, args.jobs)
+    for line in diagnostics:
+        print(line)
+    failed = report_errors(results)
+    print(f"{len(diagnostics)} errors in {len(locale_paths)} files")
+    if diagnostics or failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
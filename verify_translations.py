@@ -1,44 +1,99 @@
 
-import os
-import subprocess
+import argparse
+import sys
 
-def get_locale_from_path(path):
-    parts = path.split(os.sep)
-    for part in parts:
-        if part.startswith('values-'):
-            locale = part.split('values-')[1]
-            return locale
-    return "base"
+from content_cache import ContentHashCache, file_hash
+from git_changes import add_changes_arguments, changes_from_args
+from locale_batch import add_jobs_argument, locale_string_files, report_errors, run_locales
+from strings_catalog import BASE_STRINGS_FILE, RES_PATH, StringsCatalog, fallback_paths
 
-def main():
-    base_strings_file = 'app/src/main/res/values/strings.xml'
-    
-    res_path = 'app/src/main/res'
-    string_files = []
-    for dirpath, _, filenames in os.walk(res_path):
-        for filename in filenames:
-            if filename == 'strings.xml':
-                string_files.append(os.path.join(dirpath, filename))
+CACHE_FILE = '.verify_translations_cache.json'
+
+# One catalog per process: each pool worker parses the base file and the files it diffs once
+_catalogs = {}
+
+def _catalog(res_path):
+    if res_path not in _catalogs:
+        _catalogs[res_path] = StringsCatalog(res_path)
+    return _catalogs[res_path]
+
+def diff_locale(locale, string_file, res_path=RES_PATH, keys=None):
+    """
+    Returns the names of the base entries a locale lacks even with its fallbacks, and of the
+    entries it has that the base does not. keys limits the base (kind, name) keys looked at.
+    """
+    catalog = _catalog(res_path)
+    missing = [name for kind, name in catalog.missing_keys(locale) if keys is None or (kind, name) in keys]
+    extra = [name for _, name in catalog.extra_keys(locale)]
+    return {'missing': missing, 'extra': extra}
 
+def diff_changed(changes, locale_paths, jobs=1):
+    """Diffs the locales a git change affects; those untouched by it only for the base entries it added or edited."""
+    full, partial = changes.affected(locale_paths)
+    results = (run_locales(diff_locale, full, jobs, RES_PATH)
+               + run_locales(diff_locale, partial, jobs, RES_PATH, changes.base_keys()))
+    return {result.locale: result.value for result in results if result.ok}, results
+
+def report(locale_paths, diffs, results):
+    """Prints the locales that miss translations and exits with status 1 if any do."""
     all_good = True
-    for string_file in string_files:
-        locale = get_locale_from_path(string_file)
-        if locale == "base" or "b+es+419" in locale:
+    for locale, path in locale_paths:
+        if locale not in diffs:
             continue
-
         print(f"Verifying {locale}...")
-        
-        result = subprocess.run(['python', 'update_translations.py', base_strings_file, string_file], capture_output=True, text=True)
-        
-        # The first line is "<!-- Missing translations -->"
-        if len(result.stdout.strip().splitlines()) > 1:
-            print(f"  -> Missing translations in {string_file}")
+        if diffs[locale]['missing']:
+            print(f"  -> Missing translations in {path}")
             all_good = False
 
+    if report_errors(results):
+        all_good = False
+
     if all_good:
         print("All translations are up to date!")
     else:
         print("Some translations are missing.")
+        sys.exit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every locale for strings missing from values/strings.xml")
+    add_jobs_argument(parser)
+    parser.add_argument('--no-cache', action='store_true', help='re-diff every locale and ignore the cache file')
+    add_changes_arguments(parser)
+    args = parser.parse_args()
+
+    locale_paths = [(locale, path) for locale, path in locale_string_files() if "b+es+419" not in locale]
+    changes = changes_from_args(args)
+    if changes is not None:
+        diffs, results = diff_changed(changes, locale_paths, args.jobs)
+        report(locale_paths, diffs, results)
+        return
+
+    # Only locales whose file, fallback files or the base file changed since the last run are re-diffed
+    cache = ContentHashCache(CACHE_FILE, version=2)
+    base_hash = file_hash(BASE_STRINGS_FILE)
+    diffs = {}
+    hashes = {}
+    stale = []
+    for locale, path in locale_paths:
+        hashes[locale] = [file_hash(p) for p in [path] + fallback_paths(path)]
+        cached = None if args.no_cache else cache.get(locale, base_hash, *hashes[locale])
+        if cached is None:
+            stale.append((locale, path))
+        else:
+            diffs[locale] = cached
+
+    results = []
+    if stale:
+        results = run_locales(diff_locale, stale, args.jobs, RES_PATH)
+        for result in results:
+            if result.ok:
+                diffs[result.locale] = result.value
+                cache.put(result.locale, result.value, base_hash, *hashes[result.locale])
+
+    cache.prune(hashes)
+    cache.save()
+
+    report(locale_paths, diffs, results)
 
 if __name__ == '__main__':
     main()
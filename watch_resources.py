@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Watches the string resources and the Kotlin sources and re-checks only what
+changed.
+
+The catalog of every values*/strings.xml and the resource usage index stay
+loaded between edits. When a strings.xml is saved, that file alone is
+validated (validate_resources), linted for leaked markers and bad entities,
+and diffed against the base; when the base itself changes, every locale's
+missing count is refreshed from the cached parses. When a .kt file is saved,
+only that file is rescanned for references to undefined keys and for keys it
+was the last user of. Bursts of events (an editor writing a temp file, then
+renaming it) are coalesced with a short debounce.
+
+    python watch_resources.py
+    python watch_resources.py --sources app/src/main/java --debounce 0.2
+    python watch_resources.py --poll            # no inotify (macOS, network mounts)
+
+Linux inotify is used through ctypes; elsewhere, or with --poll, the files
+are polled for mtime changes.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+from lint_resources import lint_file
+from resource_usage import UsageIndex
+from strings_catalog import RES_PATH, StringsCatalog, get_locale_from_path
+from validate_resources import base_format_signatures, validate_file
+
+PRESENTATION_SOURCES = 'app/src/main/java/com/contacts/android/contacts/presentation'
+# Rules validate_file does not already cover
+LINT_RULES = ['leaked-marker', 'malformed-entity']
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT = struct.Struct('iIII')
+
+
+def is_string_file(path):
+    return os.path.basename(path) == 'strings.xml' and os.path.basename(os.path.dirname(path)).startswith('values')
+
+
+def is_source_file(path):
+    return path.endswith('.kt')
+
+
+class InotifyWatcher:
+    """Directory watches through the Linux inotify API; raises OSError where it is unavailable."""
+
+    def __init__(self, res_path, source_roots):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("inotify is not available")
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        self.res_path = res_path
+        self._add(res_path)
+        for entry in os.scandir(res_path):
+            if entry.is_dir() and entry.name.startswith('values'):
+                self._add(entry.path)
+        for root in source_roots:
+            self._add_tree(root)
+
+    def _add(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {path}")
+        self.dirs[wd] = path
+
+    def _add_tree(self, root):
+        """Watches root and every directory below it; returns the files already in them."""
+        found = set()
+        for dirpath, _, filenames in os.walk(root):
+            self._add(dirpath)
+            found.update(os.path.join(dirpath, filename) for filename in filenames)
+        return found
+
+    def wait(self, timeout=None):
+        """Returns the paths changed within timeout seconds (None: until something changes)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                # A new values-* or source package: watch it and pick up what it already holds
+                if mask & (IN_CREATE | IN_MOVED_TO) and (directory != self.res_path or name.startswith('values')):
+                    changed.update(self._add_tree(path))
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Compares the mtimes and sizes of the watched files every interval seconds."""
+
+    def __init__(self, res_path, source_roots, interval=0.5):
+        self.res_path = res_path
+        self.source_roots = source_roots
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        for root in [self.res_path] + list(self.source_roots):
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    if is_string_file(path) or is_source_file(path):
+                        try:
+                            stat = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """Returns the paths changed within timeout seconds (None: until something changes)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            if remaining > 0:
+                time.sleep(remaining)
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(res_path, source_roots, poll=False, interval=0.5):
+    """Returns an InotifyWatcher, or a PollingWatcher when poll is set or inotify cannot be used."""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(res_path, source_roots)
+        except OSError as e:
+            print(f"inotify unavailable ({e}), polling every {interval:g}s", file=sys.stderr)
+    return PollingWatcher(res_path, source_roots, interval)
+
+
+def debounced(watcher, debounce):
+    """Yields sets of changed paths, each gathered until debounce seconds pass without another event."""
+    while True:
+        changed = watcher.wait()
+        if not changed:
+            continue
+        while True:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+        yield changed
+
+
+class ResourceWatch:
+    """The warm catalog and usage index, updated one changed file at a time."""
+
+    def __init__(self, res_path=RES_PATH):
+        self.catalog = StringsCatalog(res_path)
+        self.usage = UsageIndex()
+        self.base_signatures = base_format_signatures(self.catalog.base_path)
+        self.missing_counts = {locale: self.catalog.missing_count(locale) for locale in self.catalog.locales()}
+
+    def check_string_file(self, path):
+        """Returns the report lines for one edited (or deleted) strings.xml."""
+        locale = get_locale_from_path(path)
+        if not os.path.exists(path):
+            if locale:
+                self.catalog.paths.pop(locale, None)
+                self.catalog.reload(locale)
+                self.missing_counts.pop(locale, None)
+            return [f"{path}: deleted"]
+
+        lines = validate_file(locale, path, self.base_signatures)
+        if any(': XML: ' in line for line in lines):
+            return lines
+        lines += [f"{f['path']}:{f['line']}: {f['severity']}: [{f['rule']}] {f['name']}: {f['message']}"
+                  for f in lint_file(locale, path, LINT_RULES)]
+
+        if locale is None:
+            self.catalog.reload_base()
+            self.base_signatures = base_format_signatures(self.catalog.base_path)
+            return lines + self._base_changed()
+
+        self.catalog.paths[locale] = path
+        self.catalog.reload(locale)
+        missing = self.catalog.missing_keys(locale)
+        extra = [name for _, name in self.catalog.extra_keys(locale)]
+        self.missing_counts[locale] = len(missing)
+        if missing:
+            lines.append(f"{path}: {len(missing)} missing: {_names(missing)}")
+        if extra:
+            lines.append(f"{path}: {len(extra)} not in the base: {', '.join(extra[:10])}")
+        return lines
+
+    def _base_changed(self):
+        lines = []
+        for locale in self.catalog.locales():
+            count = self.catalog.missing_count(locale)
+            if count != self.missing_counts.get(locale):
+                lines.append(f"{self.catalog.paths[locale]}: {count} missing (was {self.missing_counts.get(locale, 0)})")
+                self.missing_counts[locale] = count
+        for (kind, name), sites in sorted(self.usage.missing(self.catalog.base_resources).items()):
+            for site, line in sites:
+                lines.append(f"{site}:{line}: error: missing {kind}: {name}")
+        return lines
+
+    def check_source_file(self, path):
+        """Returns the report lines for one edited (or deleted) Kotlin file."""
+        before = {(kind, name) for kind, name, _ in self.usage.files.get(path, {}).get('refs', [])}
+        self.usage.update_file(path)
+        lines = []
+        result = self.usage.files.get(path)
+        if result:
+            for kind, name, line in result['refs']:
+                if (kind, name) not in self.catalog.base_resources:
+                    lines.append(f"{path}:{line}: error: missing {kind}: {name}")
+        for kind, name in sorted(before):
+            if (kind, name) not in self.usage.usages and (kind, name) in self.catalog.base_resources:
+                lines.append(f"{path}: {kind} '{name}' is no longer used anywhere")
+        return lines
+
+    def handle(self, changed):
+        """Re-checks the changed paths that are string or Kotlin files; returns their report lines."""
+        lines = []
+        for path in sorted(changed):
+            if is_string_file(path):
+                lines += self.check_string_file(path)
+            elif is_source_file(path):
+                lines += self.check_source_file(path)
+        return lines
+
+
+def _names(keys, limit=10):
+    names = [name for _, name in keys]
+    return ', '.join(names[:limit]) + (f" (+{len(names) - limit} more)" if len(names) > limit else '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-check string resources and Kotlin sources as they are edited")
+    parser.add_argument('--sources', nargs='*', default=[PRESENTATION_SOURCES], help='Kotlin source trees to watch')
+    parser.add_argument('--debounce', type=float, default=0.1, help='seconds of quiet before re-checking')
+    parser.add_argument('--poll', action='store_true', help='poll for changes instead of using inotify')
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between polls')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    watch = ResourceWatch()
+    watcher = open_watcher(watch.catalog.res_path, args.sources, args.poll, args.interval)
+    print(f"Watching {len(watch.catalog.paths) + 1} string files and {', '.join(args.sources)} "
+          f"(ready in {(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+
+    try:
+        for changed in debounced(watcher, args.debounce):
+            start = time.perf_counter()
+            lines = watch.handle(changed)
+            relevant = [path for path in changed if is_string_file(path) or is_source_file(path)]
+            if not relevant:
+                continue
+            for line in lines:
+                print(line)
+            print(f"[{time.strftime('%H:%M:%S')}] {len(relevant)} files re-checked, {len(lines)} findings "
+                  f"in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+All-or-nothing writes of many files at once.
+
+A WriteBatch collects the new content of every file an operation produces
+and commits them together: each is first written and fsynced to a temp file
+next to its target, and only once every file has been staged are they
+renamed over their targets, one os.replace() each. An error or crash while
+staging leaves every target untouched; a target is never seen half written.
+Temp files are hidden (.strings.xml.<pid>.tmp), so aapt's default ignore
+pattern skips any that a killed process leaves in a values-* directory, and
+the next commit to the same file removes them.
+Files whose content would not change are not staged at all, so re-running a
+bulk operation over a clean tree does no disk writes.
+
+    with WriteBatch() as batch:
+        for path, content in outputs:
+            batch.write(path, content)
+    # committed here; discarded instead if the block raised
+
+Output too large to hold in memory is streamed with AtomicWriter instead,
+which follows the same temp file and rename protocol for a single file.
+"""
+
+import filecmp
+import glob
+import os
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except (FileNotFoundError, UnicodeDecodeError):
+        return None
+
+
+def temp_path(path, pid=None):
+    """Returns the hidden file a path is staged to, e.g. values-fr/.strings.xml.1234.tmp."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.{pid or os.getpid()}.tmp')
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def remove_stale_temp_files(path):
+    """Removes the temp files of path left by processes that no longer run; returns how many."""
+    directory, name = os.path.split(path)
+    removed = 0
+    for stale in glob.glob(os.path.join(glob.escape(directory), f'.{glob.escape(name)}.*.tmp')):
+        pid = stale.rsplit('.', 2)[-2]
+        if pid.isdigit() and int(pid) != os.getpid() and not _process_alive(int(pid)):
+            os.remove(stale)
+            removed += 1
+    return removed
+
+
+class WriteBatch:
+    """Pending {path: content}, committed together by commit() or on leaving a with block."""
+
+    def __init__(self):
+        self.pending = {}
+
+    def write(self, path, content, current=None):
+        """
+        Queues content for path unless the file already holds exactly that; returns True if queued.
+        current is the file's content when the caller already has it, saving a read.
+        """
+        if current is None or not os.path.exists(path):
+            current = _read(path)
+        if content == current:
+            self.pending.pop(path, None)
+            return False
+        self.pending[path] = content
+        return True
+
+    def update(self, other):
+        """Takes over the writes queued in another batch, e.g. one returned by a worker process."""
+        self.pending.update(other.pending)
+
+    def commit(self):
+        """Stages every pending file, then renames them all into place; returns the written paths."""
+        staged = []
+        try:
+            for path, content in self.pending.items():
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                remove_stale_temp_files(path)
+                tmp_path = temp_path(path)
+                staged.append(tmp_path)
+                with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(content)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except BaseException:
+            for tmp_path in staged:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+
+        # Every file is on disk before the first one is replaced
+        written = list(self.pending)
+        for path in written:
+            os.replace(temp_path(path), path)
+        for directory in {os.path.dirname(path) or '.' for path in written}:
+            _sync_directory(directory)
+        self.pending = {}
+        return written
+
+    def discard(self):
+        self.pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+
+def _sync_directory(directory):
+    """Makes the renames in a directory durable where the platform allows opening directories."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class AtomicWriter:
+    """
+    Streams one file's new content into its temp file; on leaving the with block the temp
+    file replaces path unless the bytes are unchanged. If the block raises, path is untouched.
+
+        with AtomicWriter(path) as f:
+            for line in lines:
+                f.write(line)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = temp_path(path)
+        self.file = None
+        self.written = False
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        remove_stale_temp_files(self.path)
+        self.file = open(self.tmp_path, 'w', encoding='utf-8', newline='')
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            self.file.close()
+            if exc_type is None and not (os.path.exists(self.path)
+                                         and filecmp.cmp(self.tmp_path, self.path, shallow=False)):
+                os.replace(self.tmp_path, self.path)
+                _sync_directory(os.path.dirname(self.path) or '.')
+                self.written = True
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        return False
+
+
+def write_file(path, content, current=None):
+    """Atomically replaces one file with content unless it is unchanged; returns True if it was written."""
+    batch = WriteBatch()
+    if not batch.write(path, content, current):
+        return False
+    batch.commit()
+    return True